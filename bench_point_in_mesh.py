@@ -0,0 +1,94 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pyvista as pv
+
+from test_pvista_async import MeshIndex, PointGenerator
+
+lib_dir = os.path.join(os.path.dirname(__file__), "nb_point_gen", "build", "python_lib")
+sys.path.append(lib_dir)
+
+try:
+    import point_generator_cpp
+except ImportError:
+    point_generator_cpp = None
+
+
+def sphere_mesh(resolution):
+    """Closed triangulated sphere with roughly 2 * resolution^2 faces"""
+    sphere = pv.Sphere(radius=0.5, theta_resolution=resolution, phi_resolution=resolution)
+    faces = sphere.triangulate().faces.reshape(-1, 4)[:, 1:]
+    return np.asarray(sphere.points, dtype=np.float64), np.asarray(faces, dtype=np.int32)
+
+
+def time_queries(is_inside, points):
+    start = time.perf_counter()
+    answers = [is_inside(p) for p in points]
+    return (time.perf_counter() - start) / len(points), answers
+
+
+def time_batch(classify, points):
+    start = time.perf_counter()
+    answers = classify(points)
+    return (time.perf_counter() - start) / len(points), answers.tolist()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Point-in-mesh query cost versus face count")
+    parser.add_argument("--resolutions", type=int, nargs="+", default=[10, 30, 100, 300])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--brute-limit", type=int, default=20_000,
+                        help="skip the per-face Python loop above this face count")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    points = rng.uniform(-0.6, 0.6, (args.queries, 3))
+
+    print(f"{'faces':>8} {'build [ms]':>11} {'brute [us]':>11} {'index [us]':>11} {'speedup':>8}"
+          f" {'batch [us]':>11} {'c++ brute [us]':>15} {'c++ index [us]':>15}")
+    for resolution in args.resolutions:
+        vertices, faces = sphere_mesh(resolution)
+
+        start = time.perf_counter()
+        index = MeshIndex(vertices, faces)
+        build_time = time.perf_counter() - start
+
+        indexed_time, indexed = time_queries(
+            lambda p: PointGenerator.is_point_inside_mesh(p, vertices, faces, index), points)
+
+        batch_time, batched = time_batch(
+            lambda p: PointGenerator.classify_points(p, vertices, faces, index), points)
+        assert batched == indexed, "batched classification disagrees with per-point queries"
+
+        if len(faces) <= args.brute_limit:
+            brute_time, brute = time_queries(
+                lambda p: PointGenerator.is_point_inside_mesh(p, vertices, faces), points)
+            assert brute == indexed, "indexed query disagrees with the full face loop"
+            brute_col = f"{brute_time * 1e6:11.1f}"
+            speedup_col = f"{brute_time / indexed_time:7.0f}x"
+        else:
+            brute_col = f"{'-':>11}"
+            speedup_col = f"{'-':>8}"
+
+        cpp_cols = f"{'-':>15} {'-':>15}"
+        if point_generator_cpp is not None:
+            cpp = point_generator_cpp.PointGenerator
+            cpp_vertices = np.asfortranarray(vertices)
+            cpp_faces = np.asfortranarray(faces)
+            cpp_index = point_generator_cpp.MeshIndex(cpp_vertices, cpp_faces)
+            cpp_brute_time, cpp_brute = time_queries(
+                lambda p: cpp.is_point_inside_mesh(p, cpp_vertices, cpp_faces), points)
+            cpp_index_time, cpp_indexed = time_queries(
+                lambda p: cpp.is_point_inside_mesh(p, cpp_index), points)
+            assert cpp_brute == cpp_indexed == indexed
+            cpp_cols = f"{cpp_brute_time * 1e6:15.2f} {cpp_index_time * 1e6:15.2f}"
+
+        print(f"{len(faces):>8} {build_time * 1e3:11.1f} {brute_col} {indexed_time * 1e6:11.1f}"
+              f" {speedup_col} {batch_time * 1e6:11.2f} {cpp_cols}")
+
+
+if __name__ == "__main__":
+    main()
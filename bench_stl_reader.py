@@ -0,0 +1,144 @@
+import argparse
+import os
+import struct
+import tempfile
+import time
+
+import numpy as np
+
+from test_pvista_async import STLReader
+
+
+def legacy_read_binary_stl(f):
+    """Per-vertex struct.unpack reader that STLReader used to ship"""
+    f.seek(80)
+    num_triangles = struct.unpack('<I', f.read(4))[0]
+
+    vertices = []
+    faces = []
+    vertex_map = {}
+
+    for i in range(num_triangles):
+        f.read(12)
+        triangle_vertices = []
+        for j in range(3):
+            vertex = struct.unpack('<fff', f.read(12))
+            if vertex not in vertex_map:
+                vertex_map[vertex] = len(vertices)
+                vertices.append(vertex)
+            triangle_vertices.append(vertex_map[vertex])
+        faces.append(triangle_vertices)
+        f.read(2)
+
+    return np.array(vertices), np.array(faces)
+
+
+def legacy_read_ascii_stl(f):
+    """Line-list ASCII reader that STLReader used to ship"""
+    vertices = []
+    faces = []
+    vertex_map = {}
+
+    lines = f.read().decode('utf-8').split('\n')
+    i = 0
+    while i < len(lines):
+        line = lines[i].strip().lower()
+        if line.startswith('facet normal'):
+            i += 2
+            triangle_vertices = []
+            for j in range(3):
+                if i < len(lines):
+                    vertex_line = lines[i].strip()
+                    if vertex_line.startswith('vertex'):
+                        coords = vertex_line.split()[1:4]
+                        vertex = (float(coords[0]), float(coords[1]), float(coords[2]))
+                        if vertex not in vertex_map:
+                            vertex_map[vertex] = len(vertices)
+                            vertices.append(vertex)
+                        triangle_vertices.append(vertex_map[vertex])
+                i += 1
+            if len(triangle_vertices) == 3:
+                faces.append(triangle_vertices)
+            i += 1
+        else:
+            i += 1
+
+    return np.array(vertices), np.array(faces)
+
+
+def random_triangles(num_triangles, seed=0):
+    """Triangle corners drawn from a shared pool, like a real scan mesh"""
+    rng = np.random.default_rng(seed)
+    pool = rng.random((max(num_triangles // 2, 3), 3)).astype(np.float32)
+    return pool[rng.integers(0, len(pool), (num_triangles, 3))]
+
+
+def write_binary_stl(path, num_triangles, seed=0):
+    triangles = np.zeros(num_triangles, dtype=STLReader.TRIANGLE_DTYPE)
+    triangles['vertices'] = random_triangles(num_triangles, seed)
+
+    with open(path, 'wb') as f:
+        f.write(b'\0' * 80)
+        f.write(struct.pack('<I', num_triangles))
+        f.write(triangles.tobytes())
+
+
+def write_ascii_stl(path, num_triangles, seed=0):
+    corners = random_triangles(num_triangles, seed)
+
+    with open(path, 'w') as f:
+        f.write("solid bench\n")
+        for tri in corners:
+            f.write("  facet normal 0 0 0\n    outer loop\n")
+            for x, y, z in tri:
+                f.write(f"      vertex {x:e} {y:e} {z:e}\n")
+            f.write("    endloop\n  endfacet\n")
+        f.write("endsolid bench\n")
+
+
+def time_reader(read_fn, path, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        with open(path, 'rb') as f:
+            start = time.perf_counter()
+            result = read_fn(f)
+            best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="STL reader throughput")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--legacy-limit", type=int, default=200_000,
+                        help="skip the legacy reader above this triangle count")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--ascii", action="store_true", help="benchmark the ASCII reader instead")
+    args = parser.parse_args()
+
+    if args.ascii:
+        write_stl, new_reader, old_reader = write_ascii_stl, STLReader._read_ascii_stl, legacy_read_ascii_stl
+    else:
+        write_stl, new_reader, old_reader = write_binary_stl, STLReader._read_binary_stl, legacy_read_binary_stl
+
+    print(f"{'triangles':>10} {'legacy [s]':>11} {'new [s]':>11} {'Mtri/s':>8} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.sizes:
+            path = os.path.join(tmp, f"bench_{n}.stl")
+            write_stl(path, n)
+
+            fast_time, (verts, faces) = time_reader(new_reader, path, args.repeats)
+
+            if n <= args.legacy_limit:
+                slow_time, (ref_verts, ref_faces) = time_reader(old_reader, path, 1)
+                assert np.array_equal(verts, ref_verts) and np.array_equal(faces, ref_faces)
+                legacy = f"{slow_time:11.3f}"
+                speedup = f"{slow_time / fast_time:7.1f}x"
+            else:
+                legacy = f"{'-':>11}"
+                speedup = f"{'-':>8}"
+
+            print(f"{n:>10} {legacy} {fast_time:11.3f} {n / fast_time / 1e6:8.2f} {speedup}")
+
+
+if __name__ == "__main__":
+    main()
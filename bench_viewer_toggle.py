@@ -0,0 +1,59 @@
+import argparse
+import time
+
+import numpy as np
+import pyvista as pv
+
+from bench_point_in_mesh import sphere_mesh
+from test_pvista_async import AsyncPyVistaViewer
+
+
+def rebuild_toggle(viewer):
+    """The previous wireframe toggle: re-add the mapper's input as a new actor"""
+    mesh = viewer.mesh_actor.GetMapper().GetInput()
+    viewer.plotter.remove_actor(viewer.mesh_actor)
+    viewer.mesh_actor = viewer.plotter.add_mesh(
+        mesh, color='lightblue', show_edges=viewer.show_wireframe,
+        edge_color='navy', opacity=0.7, name='mesh')
+
+
+def property_toggle(viewer):
+    viewer._refresh_mesh()
+
+
+def toggle_latency(viewer, toggle, repeats):
+    """Median seconds from flipping the wireframe flag to a finished frame"""
+    times = []
+    for _ in range(repeats):
+        viewer.show_wireframe = not viewer.show_wireframe
+        start = time.perf_counter()
+        toggle(viewer)
+        viewer.plotter.render()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Wireframe toggle latency versus face count")
+    parser.add_argument("--resolutions", type=int, nargs="+", default=[30, 100, 300, 700])
+    parser.add_argument("--repeats", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'faces':>9} {'rebuild [ms]':>13} {'property [ms]':>14}")
+    for resolution in args.resolutions:
+        vertices, faces = sphere_mesh(resolution)
+
+        viewer = AsyncPyVistaViewer()
+        viewer.plotter = pv.Plotter(off_screen=True, window_size=(800, 600))
+        viewer._update_mesh(vertices, faces)
+        viewer.plotter.render()
+
+        rebuild = toggle_latency(viewer, rebuild_toggle, args.repeats)
+        reuse = toggle_latency(viewer, property_toggle, args.repeats)
+        viewer.plotter.close()
+
+        print(f"{len(faces):>9} {rebuild * 1e3:13.2f} {reuse * 1e3:14.2f}")
+
+
+if __name__ == "__main__":
+    main()
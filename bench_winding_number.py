@@ -0,0 +1,74 @@
+import argparse
+import time
+
+import numpy as np
+
+from bench_point_in_mesh import sphere_mesh
+from test_pvista_async import MeshIndex, PointGenerator, WindingNumberTree
+
+
+def classify_parity(vertices, faces, points):
+    index = MeshIndex(vertices, faces)
+    return PointGenerator.classify_points(points, vertices, faces, index)
+
+
+def classify_winding(vertices, faces, points, beta):
+    return WindingNumberTree(vertices, faces, beta=beta).classify(points)
+
+
+def timed(classify, *args):
+    """Wall time of one call, including building the index"""
+    start = time.perf_counter()
+    answers = classify(*args)
+    return time.perf_counter() - start, answers
+
+
+def query_points(rng, vertices, count, margin=0.02):
+    """Random points clear of the surface plus points whose +X ray runs
+    exactly through mesh vertices, where ray parity is fragile"""
+    points = rng.uniform(-0.6, 0.6, (count, 3))
+    radius = np.linalg.norm(points, axis=1)
+    points = points[np.abs(radius - 0.5) > margin]
+
+    grazing = vertices[rng.integers(len(vertices), size=count // 4)].copy()
+    grazing[:, 0] = rng.uniform(-0.6, 0.0, len(grazing))
+    inner = np.linalg.norm(grazing, axis=1)
+    grazing = grazing[np.abs(inner - 0.5) > margin]
+    return points, grazing
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Winding-number versus ray-parity inside test")
+    parser.add_argument("--resolutions", type=int, nargs="+", default=[10, 30, 100, 300])
+    parser.add_argument("--queries", type=int, default=20_000)
+    parser.add_argument("--holes", type=float, default=0.01,
+                        help="fraction of faces removed for the open-mesh case")
+    parser.add_argument("--beta", type=float, default=2.0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+
+    print(f"{'faces':>8} {'case':>8} {'parity [us]':>12} {'winding [us]':>13}"
+          f" {'parity err':>11} {'winding err':>12}")
+    for resolution in args.resolutions:
+        vertices, faces = sphere_mesh(resolution)
+        points, grazing = query_points(rng, vertices, args.queries)
+
+        # The discretized sphere is inscribed in the analytic one, and the
+        # margin keeps every query clear of the gap between them
+        open_faces = faces[rng.random(len(faces)) >= args.holes]
+        cases = [("closed", faces, points), ("grazing", faces, grazing), ("holes", open_faces, points)]
+
+        for name, case_faces, case_points in cases:
+            truth = np.linalg.norm(case_points, axis=1) < 0.5
+            parity_time, parity = timed(classify_parity, vertices, case_faces, case_points)
+            winding_time, winding = timed(classify_winding, vertices, case_faces, case_points, args.beta)
+
+            print(f"{len(case_faces):>8} {name:>8}"
+                  f" {parity_time / len(case_points) * 1e6:12.2f}"
+                  f" {winding_time / len(case_points) * 1e6:13.2f}"
+                  f" {np.mean(parity != truth):11.2%} {np.mean(winding != truth):12.2%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ from dearpygui.dearpygui import *
 from viewer_3d import Viewer3D
 
 import math
+import queue
 
 class PipelineApp:
     _instance = None
@@ -12,7 +13,8 @@ class PipelineApp:
             cls._instance = super().__new__(cls)
             cls._instance.node_editor = "node_editor"
             cls._instance.nodes = {}              # tag → node instance
-            cls._instance.viewer_3d = Viewer3D()
+            cls._instance.ui_queue = queue.Queue()  # (fn, args, kwargs) for the render thread
+            cls._instance.viewer_3d = Viewer3D(call_on_ui=cls._instance.call_on_ui)
 
             # ←←← Auto-layout state
             cls._instance._layout_angle = 0.0
@@ -25,6 +27,23 @@ class PipelineApp:
     def viewer(self):
         return self._instance.viewer_3d
 
+    def call_on_ui(self, fn, *args, **kwargs):
+        """Queue fn(*args, **kwargs) to run on the render thread; safe from any thread"""
+        self._instance.ui_queue.put((fn, args, kwargs))
+
+    def drain_ui(self):
+        """Run every queued UI update; called once per frame by the render loop"""
+        ui_queue = self._instance.ui_queue
+        while True:
+            try:
+                fn, args, kwargs = ui_queue.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                fn(*args, **kwargs)
+            except Exception as e:
+                print(f"UI update failed: {e}")
+
     def get_next_node_position(self):
         """Golden-angle spiral layout — always finds free space"""
         app = self._instance
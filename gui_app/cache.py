@@ -0,0 +1,97 @@
+# cache.py
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class OutputCache:
+    """Node outputs addressed by the hash of everything that produced them
+
+    An output is a dict of NumPy arrays. Keys come from make_key(), so equal
+    node type, parameters and upstream outputs always find the same entry.
+    Entries live in an in-memory LRU bounded by their total array bytes and,
+    when a directory is given, in one .npz file per key that outlives the
+    session.
+    """
+
+    def __init__(self, max_bytes=512 * 1024**2, directory=None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._entries = OrderedDict()  # key → {name: array}, least recently used first
+        self._bytes = 0
+        self._lock = threading.Lock()  # nodes execute on scheduler pool threads
+
+    @staticmethod
+    def make_key(node_type, params, input_hashes=()):
+        payload = json.dumps([node_type, params, list(input_hashes)], sort_keys=True, default=repr)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    @staticmethod
+    def nbytes(arrays):
+        return sum(array.nbytes for array in arrays.values())
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def get(self, key):
+        """Arrays stored under `key`, or None"""
+        with self._lock:
+            arrays = self._entries.get(key)
+            if arrays is not None:
+                self._entries.move_to_end(key)
+                return arrays
+
+        if not self.directory or not os.path.exists(self._path(key)):
+            return None
+        try:
+            with np.load(self._path(key), allow_pickle=False) as npz:
+                arrays = {name: npz[name] for name in npz.files}
+        except (OSError, ValueError) as e:
+            print(f"Warning: unreadable cache entry {key}: {e}")
+            return None
+        self._remember(key, arrays)
+        return arrays
+
+    def put(self, key, arrays):
+        """Store `arrays` under `key` in memory and, if enabled, on disk"""
+        # Read-only arrays (e.g. from a MeshData) are shared, others copied
+        arrays = {name: np.asarray(array) for name, array in arrays.items()}
+        arrays = {name: array.copy() if array.flags.writeable else array
+                  for name, array in arrays.items()}
+        self._remember(key, arrays)
+
+        if self.directory and not os.path.exists(self._path(key)):
+            # Write under a temporary name so a crash never leaves a torn entry
+            tmp_path = f"{self._path(key)}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(tmp_path, self._path(key))
+
+    def _remember(self, key, arrays):
+        # Every reader shares these arrays, so nobody may write to them
+        for array in arrays.values():
+            array.flags.writeable = False
+
+        size = self.nbytes(arrays)
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self.nbytes(self._entries.pop(key))
+            if size > self.max_bytes:
+                return
+            self._entries[key] = arrays
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= self.nbytes(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
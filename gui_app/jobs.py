@@ -0,0 +1,101 @@
+# jobs.py
+import multiprocessing
+import threading
+import time
+
+
+class JobCancelled(Exception):
+    """Raised inside a job at its first checkpoint after cancel()"""
+
+
+def _call_in_child(conn, fn, args):
+    try:
+        conn.send((True, fn(*args)))
+    except Exception as e:
+        conn.send((False, f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+class Job:
+    """One run of a node's heavy work
+
+    Carries the cancellation token, reports progress at most every
+    PROGRESS_INTERVAL seconds, times itself and forwards UI updates to the
+    render thread. Work functions call progress() or check() regularly;
+    both raise JobCancelled once the job has been cancelled.
+    """
+
+    PROGRESS_INTERVAL = 0.1  # seconds between progress events reaching the UI
+
+    def __init__(self, node):
+        self.node = node
+        self.started = time.perf_counter()
+        self.finished = None
+        self._cancelled = threading.Event()
+        self._last_progress = 0.0
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    @property
+    def elapsed(self):
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return end - self.started
+
+    def check(self):
+        if self.cancelled:
+            raise JobCancelled(f"{self.node.name} cancelled")
+
+    def ui(self, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) on the render thread"""
+        self.node.app.call_on_ui(fn, *args, **kwargs)
+
+    def progress(self, fraction, message=None, force=False):
+        """Report progress through node.on_progress; events closer together
+        than PROGRESS_INTERVAL are dropped unless forced"""
+        self.check()
+        now = time.perf_counter()
+        if not force and now - self._last_progress < self.PROGRESS_INTERVAL:
+            return
+        self._last_progress = now
+        self.ui(self.node.on_progress, fraction, message)
+
+    def run_in_process(self, fn, *args, poll_interval=0.1):
+        """Return fn(*args) computed in a child process
+
+        For native calls that never reach a checkpoint: cancel() terminates
+        the child instead. fn, its arguments and its result must pickle.
+        """
+        self.check()
+        ctx = multiprocessing.get_context("spawn")
+        receiver, sender = ctx.Pipe(duplex=False)
+        process = ctx.Process(target=_call_in_child, args=(sender, fn, args), daemon=True)
+        process.start()
+        sender.close()
+
+        try:
+            while not receiver.poll(poll_interval):
+                if self.cancelled:
+                    process.terminate()
+                    raise JobCancelled(f"{self.node.name} cancelled")
+            try:
+                ok, value = receiver.recv()
+            except EOFError:
+                # The child died without answering, e.g. a crash in native code
+                process.join()
+                raise RuntimeError(f"Worker process exited with code {process.exitcode}")
+        finally:
+            receiver.close()
+            process.join()
+
+        if not ok:
+            raise RuntimeError(value)
+        return value
+
+    def finish(self):
+        self.finished = time.perf_counter()
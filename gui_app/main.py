@@ -1,28 +1,10 @@
-import dearpygui.dearpygui as dpg
-import pymeshlab
 import os
 import platform
 
-from app import get_app_singleton
-from nodes.base_node import BaseNode
-from nodes.import_geometry import ImportGeometryNode
-from nodes.geometry_builder import GeometryBuilderNode
-from nodes.mesh_clean import MeshCleanNode
-from nodes.generate_mesh import GenerateMeshNode
-from nodes.problem_setup import ProblemSetupNode
-from nodes.solver import SolverNode
-from nodes.postprocess import PostProcessNode
-
-# Global registry for nodes
-NODE_REGISTRY = {
-    "ImportGeometryNode": ImportGeometryNode,
-    "GeometryBuilderNode": GeometryBuilderNode,
-    "MeshCleanNode": MeshCleanNode,
-    "GenerateMeshNode": GenerateMeshNode,
-    "ProblemSetupNode": ProblemSetupNode,
-    "SolverNode": SolverNode,
-    "PostProcessNode": PostProcessNode,
-}
+# Job worker processes are spawned, and spawning re-runs this file as
+# __mp_main__ in each of them. Everything that pulls in the GUI is therefore
+# imported under the __main__ guard at the bottom; the callbacks below only
+# ever run in the GUI process, where those names exist.
 
 PROPERTY_EDITOR_TAG = "property_editor"
 
@@ -102,8 +84,8 @@ def link_callback(sender, app_data):
     link_id = dpg.add_node_link(output_attr_tag, input_attr_tag, parent=sender)
     LINKS[link_id] = (output_node, input_node)
 
-    # Notify the downstream node that it now has a new input
-    input_node.set_input(input_attr_tag, output_node)
+    # The downstream node now has a new input: bring it and its consumers up to date
+    app.scheduler.run(input_node)
 
     print(f"Linked: {output_node.name} → {input_node.name}")
 
@@ -122,8 +104,7 @@ def delink_callback(sender, app_data):
     else:
         # Default fallback: just resets internal state
         input_node.input_mesh = None
-        input_node.ms = None
-        input_node.output_mesh = None
+        input_node.output = None
         dpg.set_item_label(input_node.node_tag, input_node.name)
 
     print(f"Unlinked: {output_node.name} → {input_node.name}")
@@ -132,6 +113,9 @@ def delink_callback(sender, app_data):
     del LINKS[link_id]
     dpg.delete_item(link_id)
 
+    # The input is gone, so nothing computed from it is valid anymore
+    get_app_singleton().scheduler.mark_dirty(input_node)
+
 
 def node_selected(sender, app_data):
     selected_nodes = dpg.get_selected_nodes(sender)
@@ -316,78 +300,112 @@ def create_light_theme():
             
     return light_theme
 
-# Apply it
-dpg.create_context()
-#dpg.bind_theme(create_dark_theme())
-dpg.bind_theme(create_light_theme())
-load_vscode_font()
-
-dpg.create_viewport(title='Engineering Pipeline Studio', width=1600, height=1000)
-app = get_app_singleton()
-#dpg.set_item_user_data("app", app)          # cheap way to make it reachable from callback
-
-# Add handler IMMEDIATELY after context/viewport, wrapped in registry
-with dpg.handler_registry(tag="global_node_selector"):  # Clean registry tag
-    dpg.add_mouse_click_handler(
-        button=dpg.mvMouseButton_Left,  # Left-click to select
-        callback=on_node_click
-    )
-
-with dpg.window(tag="MainWindow", label="main_window"):
-    with dpg.menu_bar():
-        with dpg.menu(label="File"):
-            dpg.add_menu_item(label="New")
-            dpg.add_menu_item(label="Load")
-            dpg.add_menu_item(label="Save")
-        with dpg.menu(label="View"):
-            dpg.add_menu_item(label="3D Viewer", callback=lambda: app.viewer.show())
-        with dpg.menu(label="Layout"):
-            dpg.add_menu_item(label="Reset Auto-Layout", 
-                              callback=lambda: get_app_singleton().reset_layout())
-
-    with dpg.group(horizontal=True):
-
-        # Left: Node palette 
-        with dpg.child_window(width=250, autosize_y=True):
-            with dpg.child_window(height=400, autosize_x=True, border=False):
-                dpg.add_text("Node Library", bullet=True)
-                dpg.add_separator()
-                for node_name in NODE_REGISTRY.keys():
-                    dpg.add_button(label=node_name.replace("Node", ""),
-                                width=-1, height=35,
-                                callback=create_node_callback,
-                                user_data=node_name)
-
-            # Left bottom: Property editor 
-            with dpg.child_window(autosize_x=True, border=True):
-                dpg.add_text("Properties", bullet=True)
-                dpg.add_separator()
-                with dpg.group(tag=PROPERTY_EDITOR_TAG):
-                    dpg.add_text("Select a node to edit properties")
-
-        # Center: Node editor
-        with dpg.child_window(autosize_x=True, autosize_y=True):
-            with dpg.node_editor(callback=link_callback,
-                                 delink_callback=delink_callback,
-                                 #selection_callback=node_selected,
-                                 minimap=True,
-                                 minimap_location=dpg.mvNodeMiniMap_Location_BottomRight,
-                                 tag="node_editor") as node_editor_tag:
-                print("Created node editor with tag", node_editor_tag)
-                app.node_editor_tag = node_editor_tag
-
-
-# Store nodes in app singleton so link_callback can find them
-app.nodes = {}  # will be filled when nodes call BaseNode.__init__
-
-# Initial clear
-clear_property_editor()
-
-dpg.setup_dearpygui()
-dpg.set_primary_window("MainWindow", True)
-dpg.show_viewport()
-
-while dpg.is_dearpygui_running():
-    dpg.render_dearpygui_frame()
-
-dpg.destroy_context()
+# Job worker processes (spawned) import this module; only start the GUI when run as a script
+if __name__ == "__main__":
+    import dearpygui.dearpygui as dpg
+    import pymeshlab
+
+    from app import get_app_singleton
+    from scheduler import GraphScheduler
+    from cache import OutputCache
+    from nodes.base_node import BaseNode
+    from nodes.import_geometry import ImportGeometryNode
+    from nodes.geometry_builder import GeometryBuilderNode
+    from nodes.mesh_clean import MeshCleanNode
+    from nodes.generate_mesh import GenerateMeshNode
+    from nodes.problem_setup import ProblemSetupNode
+    from nodes.solver import SolverNode
+    from nodes.postprocess import PostProcessNode
+
+    # Global registry for nodes
+    NODE_REGISTRY = {
+        "ImportGeometryNode": ImportGeometryNode,
+        "GeometryBuilderNode": GeometryBuilderNode,
+        "MeshCleanNode": MeshCleanNode,
+        "GenerateMeshNode": GenerateMeshNode,
+        "ProblemSetupNode": ProblemSetupNode,
+        "SolverNode": SolverNode,
+        "PostProcessNode": PostProcessNode,
+    }
+
+    # Apply it
+    dpg.create_context()
+    #dpg.bind_theme(create_dark_theme())
+    dpg.bind_theme(create_light_theme())
+    load_vscode_font()
+
+    dpg.create_viewport(title='Engineering Pipeline Studio', width=1600, height=1000)
+    app = get_app_singleton()
+    app.scheduler = GraphScheduler(app, LINKS)
+
+    # Node outputs; set PIPELINE_CACHE_DIR to keep them across sessions
+    app.cache = OutputCache(max_bytes=512 * 1024**2, directory=os.environ.get("PIPELINE_CACHE_DIR"))
+    #dpg.set_item_user_data("app", app)          # cheap way to make it reachable from callback
+
+    # Add handler IMMEDIATELY after context/viewport, wrapped in registry
+    with dpg.handler_registry(tag="global_node_selector"):  # Clean registry tag
+        dpg.add_mouse_click_handler(
+            button=dpg.mvMouseButton_Left,  # Left-click to select
+            callback=on_node_click
+        )
+
+    with dpg.window(tag="MainWindow", label="main_window"):
+        with dpg.menu_bar():
+            with dpg.menu(label="File"):
+                dpg.add_menu_item(label="New")
+                dpg.add_menu_item(label="Load")
+                dpg.add_menu_item(label="Save")
+            with dpg.menu(label="View"):
+                dpg.add_menu_item(label="3D Viewer", callback=lambda: app.viewer.show())
+            with dpg.menu(label="Layout"):
+                dpg.add_menu_item(label="Reset Auto-Layout", 
+                                  callback=lambda: get_app_singleton().reset_layout())
+
+        with dpg.group(horizontal=True):
+
+            # Left: Node palette 
+            with dpg.child_window(width=250, autosize_y=True):
+                with dpg.child_window(height=400, autosize_x=True, border=False):
+                    dpg.add_text("Node Library", bullet=True)
+                    dpg.add_separator()
+                    for node_name in NODE_REGISTRY.keys():
+                        dpg.add_button(label=node_name.replace("Node", ""),
+                                    width=-1, height=35,
+                                    callback=create_node_callback,
+                                    user_data=node_name)
+
+                # Left bottom: Property editor 
+                with dpg.child_window(autosize_x=True, border=True):
+                    dpg.add_text("Properties", bullet=True)
+                    dpg.add_separator()
+                    with dpg.group(tag=PROPERTY_EDITOR_TAG):
+                        dpg.add_text("Select a node to edit properties")
+
+            # Center: Node editor
+            with dpg.child_window(autosize_x=True, autosize_y=True):
+                with dpg.node_editor(callback=link_callback,
+                                     delink_callback=delink_callback,
+                                     #selection_callback=node_selected,
+                                     minimap=True,
+                                     minimap_location=dpg.mvNodeMiniMap_Location_BottomRight,
+                                     tag="node_editor") as node_editor_tag:
+                    print("Created node editor with tag", node_editor_tag)
+                    app.node_editor_tag = node_editor_tag
+
+
+    # Store nodes in app singleton so link_callback can find them
+    app.nodes = {}  # will be filled when nodes call BaseNode.__init__
+
+    # Initial clear
+    clear_property_editor()
+
+    dpg.setup_dearpygui()
+    dpg.set_primary_window("MainWindow", True)
+    dpg.show_viewport()
+
+    while dpg.is_dearpygui_running():
+        app.drain_ui()
+        dpg.render_dearpygui_frame()
+
+    app.scheduler.shutdown()
+    dpg.destroy_context()
@@ -0,0 +1,133 @@
+# mesh_data.py
+import hashlib
+import types
+
+import numpy as np
+
+from utils.mesh_helpers import mesh_set_from_arrays, mesh_to_arrays
+
+
+def _frozen(array, dtype=None, columns=None):
+    """Read-only array, reshaped to (n, columns) if given; copied only if the
+    caller could still write to it"""
+    array = np.asarray(array, dtype=dtype)
+    if columns is not None:
+        array = array.reshape(-1, columns)
+    if array.flags.writeable:
+        array = array.copy()
+        array.flags.writeable = False
+    return array
+
+
+class MeshData:
+    """Immutable mesh payload passed between nodes
+
+    Holds read-only vertex, face and tet cell arrays plus named per-vertex
+    fields. Nodes never mutate their inputs: they convert to a MeshSet at
+    their boundary, work on that copy and wrap the result in a new MeshData.
+    Derived meshes (with_field) share every unchanged array.
+
+    The read accessors mirror pymeshlab.Mesh, so the viewer and node code
+    accept either.
+    """
+
+    __slots__ = ("vertices", "faces", "cells", "fields", "_content_hash")
+
+    def __init__(self, vertices, faces=None, cells=None, fields=None):
+        vertices = _frozen(vertices, np.float64, 3)
+        set_slot = super().__setattr__
+        set_slot("vertices", vertices)
+        set_slot("faces", _frozen(faces if faces is not None else [], np.int32, 3))
+        set_slot("cells", _frozen(cells if cells is not None else [], np.int32, 4))
+
+        frozen_fields = {}
+        for name, values in (fields or {}).items():
+            values = _frozen(values)
+            if len(values) != len(vertices):
+                raise ValueError(f"Field '{name}' has {len(values)} values for {len(vertices)} vertices")
+            frozen_fields[name] = values
+        set_slot("fields", types.MappingProxyType(frozen_fields))
+        set_slot("_content_hash", None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"MeshData is immutable, cannot set '{name}'")
+
+    def __reduce__(self):
+        # Pickle through the constructor; the default slot restore would hit __setattr__
+        return MeshData.from_arrays, (self.arrays(),)
+
+    @classmethod
+    def from_mesh(cls, ml_mesh):
+        """Copy a pymeshlab mesh; volume meshes keep their cells"""
+        return cls.from_arrays(mesh_to_arrays(ml_mesh))
+
+    def to_mesh_set(self):
+        """Fresh MeshSet holding a writable copy of this mesh
+
+        pymeshlab meshes cannot hold cells, so a volume mesh becomes its
+        boundary surface.
+        """
+        return mesh_set_from_arrays(self.arrays())
+
+    def with_field(self, name, values):
+        """Copy of this mesh with one more per-vertex field, sharing all other arrays"""
+        fields = dict(self.fields)
+        fields[name] = values
+        return MeshData(self.vertices, self.faces, self.cells, fields)
+
+    # ── Flat array form, as stored by OutputCache ──
+    def arrays(self):
+        arrays = {"vertices": self.vertices, "faces": self.faces, "cells": self.cells}
+        arrays.update({f"field:{name}": values for name, values in self.fields.items()})
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        fields = {key[len("field:"):]: values for key, values in arrays.items() if key.startswith("field:")}
+        return cls(arrays["vertices"], arrays.get("faces"), arrays.get("cells"), fields)
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in self.arrays().values())
+
+    @property
+    def content_hash(self):
+        """SHA-256 over every array's name, dtype, shape and bytes; computed once"""
+        if self._content_hash is None:
+            digest = hashlib.sha256()
+            for name, array in sorted(self.arrays().items()):
+                digest.update(f"{name}:{array.dtype.str}:{array.shape}".encode())
+                digest.update(np.ascontiguousarray(array).data)
+            super().__setattr__("_content_hash", digest.hexdigest())
+        return self._content_hash
+
+    def __eq__(self, other):
+        if not isinstance(other, MeshData):
+            return NotImplemented
+        return self is other or self.content_hash == other.content_hash
+
+    def __hash__(self):
+        return hash(self.content_hash)
+
+    def __repr__(self):
+        return (f"MeshData({self.vertex_number()} verts, {self.face_number()} faces, "
+                f"{self.cell_number()} cells, fields={list(self.fields)})")
+
+    # ── pymeshlab.Mesh-style read accessors ──
+    def vertex_matrix(self):
+        return self.vertices
+
+    def face_matrix(self):
+        return self.faces
+
+    def cell_matrix(self):
+        return self.cells
+
+    def vertex_number(self):
+        return len(self.vertices)
+
+    def face_number(self):
+        return len(self.faces)
+
+    def cell_number(self):
+        return len(self.cells)
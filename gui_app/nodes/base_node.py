@@ -1,6 +1,10 @@
 import dearpygui.dearpygui as dpg
 import uuid
+import threading
 from app import get_app_singleton
+from jobs import Job
+from cache import OutputCache
+from mesh_data import MeshData
 
 class BaseNode:
     def __init__(self, name="BaseNode"):
@@ -11,6 +15,22 @@ class BaseNode:
         self.output_attr = f"{self.tag}_out"
         self.node_tag = f"node_{self.tag}"
 
+        # Cleared by the scheduler once execute() has run on current inputs
+        self.dirty = True
+
+        # MeshData handed to downstream nodes; never mutated once published
+        self.output = None
+
+        # Cache keys of the upstream outputs (set by the scheduler) and of
+        # this node's own output; None when an output is not cacheable
+        self.input_hashes = []
+        self.output_hash = None
+
+        # Job currently running this node's heavy work, and how long the last one took
+        self.job = None
+        self.last_job_time = None
+        self._job_lock = threading.Lock()
+
         print(f"Creating node: {self.name} with tag {self.node_tag}")
 
         # Register this instance so link_callback can find it
@@ -39,7 +59,9 @@ class BaseNode:
                 dpg.add_text("Configure me")  # placeholder
 
             with dpg.node_attribute(attribute_type=dpg.mvNode_Attr_Static):
-                dpg.add_button(label="Run", callback=self.execute)
+                with dpg.group(horizontal=True):
+                    dpg.add_button(label="Run", callback=self.run)
+                    dpg.add_button(label="Cancel", callback=self.cancel_job)
 
             with dpg.node_attribute(tag=self.output_attr, attribute_type=dpg.mvNode_Attr_Output):
                 dpg.add_text("Result")
@@ -50,5 +72,81 @@ class BaseNode:
     def set_input(self, attr_id, upstream_node):
         print(f"{self.name} received input from {upstream_node.name}")
 
+    def clear_output(self):
+        """Publish nothing, so downstream never sees a stale output or its cache key"""
+        self.output = None
+        self.output_hash = None
+
+    def mark_dirty(self, sender=None, app_data=None):
+        """Parameter callback: this node and everything downstream is stale"""
+        self.app.scheduler.mark_dirty(self)
+
+    def run(self, sender=None, app_data=None):
+        """Run button: re-execute this node and the stale part of the graph around it"""
+        self.app.scheduler.run(self)
+
+    def cache_params(self):
+        """JSON-able parameter values that determine this node's output, or
+        None if the output should not be cached"""
+        return None
+
+    def cached_output(self, compute):
+        """compute()'s MeshData, reused from app.cache when the node type,
+        cache_params() and upstream outputs have been seen before"""
+        params = self.cache_params()
+        if params is None or None in self.input_hashes:
+            self.output_hash = None
+            return compute()
+
+        key = OutputCache.make_key(type(self).__name__, params, self.input_hashes)
+        arrays = self.app.cache.get(key)
+        if arrays is None:
+            output = compute()
+            self.app.cache.put(key, output.arrays())
+        else:
+            output = MeshData.from_arrays(arrays)
+        self.output_hash = key
+        return output
+
+    def run_job(self, work, *args):
+        """Return work(job, *args), run as this node's cancellable job
+
+        Starting a job cancels the one still running. The job's progress
+        events and UI updates reach on_progress and on_job_finished on the
+        render thread; a cancelled job raises JobCancelled out of here.
+        """
+        job = Job(self)
+        with self._job_lock:
+            if self.job is not None:
+                self.job.cancel()
+            self.job = job
+        try:
+            return work(job, *args)
+        finally:
+            job.finish()
+            with self._job_lock:
+                if self.job is job:
+                    self.job = None
+            self.last_job_time = job.elapsed
+            print(f"{self.name}: job {'cancelled' if job.cancelled else 'finished'} after {job.elapsed:.2f}s")
+            job.ui(self.on_job_finished, job)
+
+    def cancel_job(self, sender=None, app_data=None):
+        with self._job_lock:
+            if self.job is not None:
+                self.job.cancel()
+
+    def on_progress(self, fraction, message=None):
+        """Render thread: show a job's progress on the node's progress bar and status text, if it has them"""
+        if dpg.does_item_exist(f"{self.tag}_progress"):
+            dpg.set_value(f"{self.tag}_progress", fraction)
+        if message and dpg.does_item_exist(f"{self.tag}_status"):
+            dpg.set_value(f"{self.tag}_status", message)
+
+    def on_job_finished(self, job):
+        """Render thread: called after every job, finished or cancelled"""
+        if job.cancelled and dpg.does_item_exist(f"{self.tag}_status"):
+            dpg.set_value(f"{self.tag}_status", f"Cancelled after {job.elapsed:.1f}s")
+
     def execute(self, sender=None, app_data=None):
         print(f"Executing {self.name} node")
\ No newline at end of file
@@ -3,13 +3,15 @@ import dearpygui.dearpygui as dpg
 import pymeshlab
 from nodes.base_node import BaseNode
 from app import get_app_singleton
+from mesh_data import MeshData
+from jobs import JobCancelled
+from utils.mesh_helpers import tetrahedralize_surface
+
 
 class GenerateMeshNode(BaseNode):
     def __init__(self):
         super().__init__("Tetrahedral Mesh")
         self.input_mesh = None
-        self.output_mesh = None
-        self.mesh_set = None
 
         with dpg.node_attribute(parent=self.node_tag,
                                attribute_type=dpg.mvNode_Attr_Static):
@@ -18,51 +20,61 @@ class GenerateMeshNode(BaseNode):
                                 default_value=1.0, 
                                 min_value=0.001, max_value=100.0,
                                 tag=f"{self.tag}_vol",
+                                callback=self.mark_dirty,
                                 width=200)
             dpg.add_slider_float(label="Max radius-edge ratio",
                                 default_value=2.0,
                                 min_value=1.0, max_value=5.0,
                                 tag=f"{self.tag}_ratio",
+                                callback=self.mark_dirty,
                                 width=200)
             dpg.add_checkbox(label="Preserve boundary",
-                            default_value=True, tag=f"{self.tag}_preserve")
+                            default_value=True, tag=f"{self.tag}_preserve",
+                            callback=self.mark_dirty)
             #dpg.add_separator()
             dpg.add_text("_" * 20)
-            dpg.add_button(label="Generate Volume Mesh", callback=self.execute)
+            dpg.add_button(label="Generate Volume Mesh", callback=self.run)
             dpg.add_text("Status: waiting for surface mesh...", tag=f"{self.tag}_status")
 
     def set_input(self, attr_id, upstream_node):
         # Accept cleaned surface mesh from previous node
-        if upstream_node and hasattr(upstream_node, "mesh_set") and upstream_node.mesh_set:
-            # Upstream node has a MeshSet, use it directly
-            self.mesh_set = upstream_node.mesh_set
-            
-        elif upstream_node and hasattr(upstream_node, "input_mesh") and upstream_node.input_mesh is not None:
-            # Upstream node has input_mesh, create new MeshSet and add it
-            try:
-                self.mesh_set = pymeshlab.MeshSet()
-                # input_mesh should be a pymeshlab.Mesh object
-                self.mesh_set.add_mesh(upstream_node.input_mesh)
-            except Exception as e:
-                print(f"Error adding mesh from input_mesh: {e}")
-                self.mesh_set = pymeshlab.MeshSet()  # Create empty MeshSet
-                
-        else:
-            # No valid mesh found
+        self.input_mesh = getattr(upstream_node, "output", None)
+        if self.input_mesh is None:
             print(f"Warning: No valid mesh found in upstream node {upstream_node.name if upstream_node else 'None'}")
-            self.mesh_set = pymeshlab.MeshSet()  # Create empty MeshSet
-        
-        self.execute()
+
+    def cache_params(self):
+        if not self.input_hashes:
+            return None
+        return {"max_vol": dpg.get_value(f"{self.tag}_vol"),
+                "ratio": dpg.get_value(f"{self.tag}_ratio"),
+                "preserve": dpg.get_value(f"{self.tag}_preserve")}
 
     def execute(self, sender=None, data=None):
-        if not self.mesh_set or self.mesh_set.is_empty():
-            dpg.set_value(f"{self.tag}_status", "Error: No surface mesh")
+        self.clear_output()
+        if self.input_mesh is None or self.input_mesh.face_number() == 0:
+            self.app.call_on_ui(dpg.set_value, f"{self.tag}_status", "Error: No surface mesh")
             return
 
-        # Ensure we have a watertight surface
-        self.mesh_set.compute_normal_for_point_clouds()  # just in case
-        self.mesh_set.remove_unreferenced_vertices()
+        try:
+            # last_job_time stays None when the cache answered without a job
+            self.last_job_time = None
+            tet_mesh = self.output = self.cached_output(lambda: self.run_job(self.tetrahedralize))
+            took = f" in {self.last_job_time:.1f}s" if self.last_job_time is not None else " (cached)"
+
+            # Visualize the volume mesh (wireframe + semi-transparent)
+            self.app.call_on_ui(self.app.viewer.load_mesh, tet_mesh, wireframe=True, opacity=0.6)
+
+            self.app.call_on_ui(dpg.set_value, f"{self.tag}_status",
+                                f"Success: {tet_mesh.vertex_number()} verts, {tet_mesh.cell_number()} tets{took}")
+            self.app.call_on_ui(dpg.set_item_label, self.node_tag,
+                                f"Tet Mesh: {tet_mesh.cell_number()} elements")
+
+        except JobCancelled:
+            raise
+        except Exception as e:
+            self.app.call_on_ui(dpg.set_value, f"{self.tag}_status", f"Error: {str(e)}")
 
+    def tetrahedralize(self, job):
         # Generate tetrahedral mesh using built-in PyMeshLab TetGen wrapper
         max_vol = dpg.get_value(f"{self.tag}_vol")
         ratio = dpg.get_value(f"{self.tag}_ratio")
@@ -73,26 +85,11 @@ class GenerateMeshNode(BaseNode):
         flags += f"a{ max_vol }"            # a = max volume
         flags += f"q{ratio}"                # q = radius-edge ratio
 
-        try:
-            self.mesh_set.generate_tetrahedralization_with_tetgen(flags=flags)
-            tet_mesh = self.mesh_set.current_mesh()
-
-            # Visualize the volume mesh (wireframe + semi-transparent)
-            get_app_singleton().viewer.load_mesh(tet_mesh, wireframe=True, opacity=0.6)
-
-            dpg.set_value(f"{self.tag}_status",
-                         f"Success: {tet_mesh.vertex_number()} verts, {tet_mesh.cell_number()} tets")
-            dpg.set_item_label(self.node_tag,
-                              f"Tet Mesh: {tet_mesh.cell_number()} elements")
-
-            self.output_mesh = tet_mesh
-
-        except Exception as e:
-            dpg.set_value(f"{self.tag}_status", f"Error: {str(e)}")
+        job.progress(0.0, "Running TetGen...", force=True)
+        return MeshData.from_arrays(job.run_in_process(tetrahedralize_surface, self.input_mesh, flags))
 
     def clear_input(self):
         self.input_mesh = None
-        self.mesh_set = None
-        self.output_mesh = None
+        self.clear_output()
         dpg.set_item_label(self.node_tag, self.name)
         dpg.set_value(f"{self.tag}_status", "Status: waiting for input...") if hasattr(self, f"{self.tag}_status") else None
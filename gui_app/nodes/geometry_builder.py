@@ -4,6 +4,7 @@ import pymeshlab
 import numpy as np
 from nodes.base_node import BaseNode
 from app import get_app_singleton
+from mesh_data import MeshData
 
 class GeometryBuilderNode(BaseNode):
     def __init__(self):
@@ -49,7 +50,7 @@ class GeometryBuilderNode(BaseNode):
                 dpg.add_button(label="Apply to Selected Two", callback=self.apply_boolean)
 
             dpg.add_separator()
-            dpg.add_button(label="Finalize & Triangulate", callback=self.finalize, width=-1)
+            dpg.add_button(label="Finalize & Triangulate", callback=self.run, width=-1)
             dpg.add_text("No geometry yet", tag=f"{self.tag}_status")
 
     def add_primitive(self):
@@ -77,6 +78,7 @@ class GeometryBuilderNode(BaseNode):
 
         self.shapes[sid] = default
         self.update_listbox()
+        self.mark_dirty()
         self.select_shape(item=sid)
 
     def update_listbox(self):
@@ -103,6 +105,7 @@ class GeometryBuilderNode(BaseNode):
         sid = int(sel.split(":")[0])
         self.shapes.pop(sid, None)
         self.update_listbox()
+        self.mark_dirty()
 
     def duplicate_selected(self):
         sel = dpg.get_value(f"{self.tag}_list")
@@ -112,6 +115,7 @@ class GeometryBuilderNode(BaseNode):
         self.current_id += 1
         self.shapes[new_id] = self.shapes[old_id].copy()
         self.update_listbox()
+        self.mark_dirty()
 
     def apply_boolean(self):
         items = dpg.get_value(f"{self.tag}_list")
@@ -137,6 +141,7 @@ class GeometryBuilderNode(BaseNode):
         self.shapes[a_id] = {"type": f"{op} Result", "translate": [0,0,0], "rotate": [0,0,0], "scale": [1,1,1]}
         self.shapes.pop(b_id, None)
         self.update_listbox()
+        self.mark_dirty()
         dpg.set_value(f"{self.tag}_status", f"{op} applied")
 
     def _create_mesh_from_shape(self, shape):
@@ -163,13 +168,26 @@ class GeometryBuilderNode(BaseNode):
 
         return ms
 
+    def cache_params(self):
+        # Shape ids are just list labels; the result only depends on the shapes
+        return list(self.shapes.values())
+
     def finalize(self):
+        self.clear_output()
         if not self.shapes:
-            dpg.set_value(f"{self.tag}_status", "No shapes")
+            self.app.call_on_ui(dpg.set_value, f"{self.tag}_status", "No shapes")
             return
 
-        self.ms.clear()
-        for shape in self.shapes.values():
+        result_mesh = self.output = self.cached_output(lambda: self.run_job(self.build))
+        self.app.call_on_ui(self.app.viewer.load_mesh, result_mesh, wireframe=False, color=[100, 200, 255, 255])
+
+        self.app.call_on_ui(dpg.set_item_label, self.node_tag, f"Builder: {result_mesh.vertex_number()} verts")
+        self.app.call_on_ui(dpg.set_value, f"{self.tag}_status", f"Finalized: {result_mesh.face_number()} triangles")
+
+    def build(self, job):
+        self.ms = pymeshlab.MeshSet()
+        for count, shape in enumerate(self.shapes.values()):
+            job.progress(count / len(self.shapes), f"Adding shape {count + 1}/{len(self.shapes)}")
             temp_ms = self._create_mesh_from_shape(shape)
             if not self.ms.is_empty():
                 self.ms.boolean_union(temp_ms)
@@ -177,15 +195,11 @@ class GeometryBuilderNode(BaseNode):
                 self.ms = temp_ms
 
         # Final clean triangulated surface
+        job.check()
         self.ms.remove_duplicate_vertices()
         self.ms.remove_duplicate_faces()
         self.ms.remove_unreferenced_vertices()
-
-        result_mesh = self.ms.current_mesh()
-        get_app_singleton().viewer.load_mesh(result_mesh, wireframe=False, color=[100, 200, 255, 255])
-
-        dpg.set_item_label(self.node_tag, f"Builder: {result_mesh.vertex_number()} verts")
-        dpg.set_value(f"{self.tag}_status", f"Finalized: {result_mesh.face_number()} triangles")
+        return MeshData.from_mesh(self.ms.current_mesh())
 
     def set_input(self, attr_id, upstream_node):
         pass  # this node has no input
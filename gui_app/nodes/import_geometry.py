@@ -3,13 +3,13 @@ import dearpygui.dearpygui as dpg
 from app import get_app_singleton
 import pymeshlab
 import os
+from mesh_data import MeshData
 
 class ImportGeometryNode(BaseNode): 
     def __init__(self):
         print("Init ImportGeometryNode")
         super().__init__(name="Import Geometry")
         self.file_path = ""
-        self.mesh_set = None
 
         self.create_node_ui_local()
 
@@ -49,22 +49,31 @@ class ImportGeometryNode(BaseNode):
 
     def load_file(self, sender, app_data):
         self.file_path = list(app_data["selections"].values())[0]
-        ms = pymeshlab.MeshSet()
-        ms.load_new_mesh(self.file_path)
-        print(f"Loaded {self.file_path}")
-        self.mesh_set = ms
+        self.run()
 
-        get_app_singleton().viewer.load_mesh(ms.current_mesh())
-        self.execute()
+    def cache_params(self):
+        # The file's identity stands in for its content; an edited file gets a new key
+        stat = os.stat(self.file_path)
+        return {"path": os.path.abspath(self.file_path), "size": stat.st_size, "mtime": stat.st_mtime_ns}
 
     def execute(self, sender=None, app_data=None):
-        if self.mesh_set:
-            dpg.set_item_label(self.node_tag, f"Geometry: {os.path.basename(self.file_path)}")
+        self.clear_output()
+        if not self.file_path:
+            return
+
+        self.output = self.cached_output(lambda: self.run_job(self.load))
+
+        self.app.call_on_ui(self.app.viewer.load_mesh, self.output)
+        self.app.call_on_ui(dpg.set_item_label, self.node_tag, f"Geometry: {os.path.basename(self.file_path)}")
+
+    def load(self, job):
+        ms = pymeshlab.MeshSet()
+        ms.load_new_mesh(self.file_path)
+        print(f"Loaded {self.file_path}")
+        return MeshData.from_mesh(ms.current_mesh())
 
     def clear_input(self):
-        self.input_mesh = None
-        self.mesh_set = None
-        self.output_mesh = None
+        self.clear_output()
         dpg.set_item_label(self.node_tag, self.name)
         dpg.set_value(f"{self.tag}_status", "Status: waiting for input...") if hasattr(self, f"{self.tag}_status") else None
 
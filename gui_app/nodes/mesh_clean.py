@@ -3,12 +3,12 @@ import dearpygui.dearpygui as dpg
 import pymeshlab
 from nodes.base_node import BaseNode
 from app import get_app_singleton
+from mesh_data import MeshData
 
 class MeshCleanNode(BaseNode):
     def __init__(self):
         super().__init__("Mesh Clean & Repair")
         self.input_mesh = None
-        self.mesh_set = None
 
         # ── Replace the placeholder static attribute with real controls ──
         static_tag = f"{self.node_tag}_static"
@@ -18,58 +18,68 @@ class MeshCleanNode(BaseNode):
                                attribute_type=dpg.mvNode_Attr_Static):
             dpg.add_text("Repair Options", bullet=True)
             dpg.add_checkbox(label="Remove duplicate vertices",
-                            default_value=True, tag=f"{self.tag}_dup_v")
+                            default_value=True, tag=f"{self.tag}_dup_v",
+                            callback=self.mark_dirty)
             dpg.add_checkbox(label="Remove duplicate faces",
-                            default_value=True, tag=f"{self.tag}_dup_f")
+                            default_value=True, tag=f"{self.tag}_dup_f",
+                            callback=self.mark_dirty)
             dpg.add_checkbox(label="Remove zero-area faces",
-                            default_value=True, tag=f"{self.tag}_zero")
+                            default_value=True, tag=f"{self.tag}_zero",
+                            callback=self.mark_dirty)
             dpg.add_checkbox(label="Fix orientation",
-                            default_value=True, tag=f"{self.tag}_orient")
+                            default_value=True, tag=f"{self.tag}_orient",
+                            callback=self.mark_dirty)
             dpg.add_separator()
-            dpg.add_button(label="Clean Now", callback=self.execute)
+            dpg.add_button(label="Clean Now", callback=self.run)
 
     def set_input(self, attr_id, upstream_node):
-        # Called automatically when someone connects to our input pin
+        # Called by the scheduler before every execute()
         print(f"{self.name} received input from {upstream_node.name}")
-        if hasattr(upstream_node, "mesh_set") and upstream_node.mesh_set:
-            self.input_mesh = upstream_node.mesh_set.current_mesh()
-            self.mesh_set = upstream_node.mesh_set
-            self.execute()  # auto-run when input arrives
-        elif hasattr(upstream_node, "output_mesh"):
-            self.input_mesh = upstream_node.output_mesh
-            self.mesh_set = pymeshlab.MeshSet()
-            self.mesh_set.add_mesh(self.input_mesh)
-            self.execute()
+        self.input_mesh = getattr(upstream_node, "output", None)
+
+    def cache_params(self):
+        # Without an upstream output there is nothing to address the result by
+        if not self.input_hashes:
+            return None
+        return {option: dpg.get_value(f"{self.tag}_{option}")
+                for option in ("dup_v", "dup_f", "zero", "orient")}
 
     def execute(self, sender=None, data=None):
-        if self.input_mesh is None and (self.mesh_set is None or self.mesh_set.is_empty()):
-            dpg.set_item_label(self.node_tag, "Mesh Clean (no input)")
+        self.clear_output()
+        if self.input_mesh is None or self.input_mesh.face_number() == 0:
+            self.app.call_on_ui(dpg.set_item_label, self.node_tag, "Mesh Clean (no input)")
             return
 
-        if self.mesh_set is None:
-            self.mesh_set = pymeshlab.MeshSet()
-            self.mesh_set.add_mesh(self.input_mesh)
+        cleaned = self.output = self.cached_output(lambda: self.run_job(self.repair))
+
+        # Show result in 3D viewer
+        self.app.call_on_ui(self.app.viewer.load_mesh, cleaned)
+
+        self.app.call_on_ui(dpg.set_item_label, self.node_tag,
+                            f"Cleaned: {cleaned.vertex_number()} verts, {cleaned.face_number()} faces")
 
-        # Apply selected repairs
+    def repair(self, job):
+        # The repairs work in place, so they run on a copy of the input
+        mesh_set = self.input_mesh.to_mesh_set()
+
+        # Apply selected repairs, checking for a cancel between filters
         if dpg.get_value(f"{self.tag}_dup_v"):
-            self.mesh_set.remove_duplicate_vertices()
+            job.check()
+            mesh_set.remove_duplicate_vertices()
         if dpg.get_value(f"{self.tag}_dup_f"):
-            self.mesh_set.remove_duplicate_faces()
+            job.check()
+            mesh_set.remove_duplicate_faces()
         if dpg.get_value(f"{self.tag}_zero"):
-            self.mesh_set.remove_zero_area_faces()
+            job.check()
+            mesh_set.remove_zero_area_faces()
         if dpg.get_value(f"{self.tag}_orient"):
-            self.mesh_set.coherent_orientation()
-
-        # Show result in 3D viewer
-        cleaned = self.mesh_set.current_mesh()
-        get_app_singleton().viewer.load_mesh(cleaned)
+            job.check()
+            mesh_set.coherent_orientation()
 
-        dpg.set_item_label(self.node_tag,
-                          f"Cleaned: {cleaned.vertex_number()} verts, {cleaned.face_number()} faces")
+        return MeshData.from_mesh(mesh_set.current_mesh())
 
     def clear_input(self):
         self.input_mesh = None
-        self.mesh_set = None
-        self.output_mesh = None
+        self.clear_output()
         dpg.set_item_label(self.node_tag, self.name)
         dpg.set_value(f"{self.tag}_status", "Status: waiting for input...") if hasattr(self, f"{self.tag}_status") else None
@@ -33,10 +33,9 @@ class PostProcessNode(BaseNode):
     def set_input(self, attr_id, upstream_node):
         if hasattr(upstream_node, "results"):
             self.input_results = upstream_node.results
-        if hasattr(upstream_node, "input_mesh"):
-            self.input_mesh = upstream_node.input_mesh
-        elif hasattr(upstream_node, "ms"):
-            self.input_mesh = upstream_node.ms.current_mesh()
+        self.input_mesh = getattr(upstream_node, "output", None)
+
+    def execute(self, sender=None, data=None):
         self.update_view()
 
     def update_view(self, sender=None, data=None):
@@ -47,8 +46,8 @@ class PostProcessNode(BaseNode):
         wireframe = dpg.get_value(f"{self.tag}_wire")
 
         scalar = None
-        if field_name == "Pressure" and self.input_results:
-            scalar = self.input_results.get("pressure")
+        if field_name == "Pressure":
+            scalar = self.input_mesh.fields.get("pressure")
         elif field_name == "Velocity Mag" and self.input_results:
             # Fake velocity magnitude
             verts = self.input_mesh.vertex_matrix()
@@ -56,7 +55,7 @@ class PostProcessNode(BaseNode):
 
         clip_z = dpg.get_value(f"{self.tag}_clip_z") if dpg.get_value(f"{self.tag}_clip") else None
 
-        get_app_singleton().viewer.load_mesh(
+        self.app.call_on_ui(self.app.viewer.load_mesh,
             self.input_mesh,
             scalar_field=scalar,
             colormap=dpg.mvPlotColormap_Viridis if scalar is not None else None,
@@ -77,7 +76,7 @@ class PostProcessNode(BaseNode):
         verts = self.input_mesh.vertex_matrix()
         faces = self.input_mesh.face_matrix()
         pv_mesh = pv.PolyData(verts, faces)
-        if self.input_results and "pressure" in self.input_results:
-            pv_mesh.point_data["Pressure"] = self.input_results["pressure"]
+        if "pressure" in self.input_mesh.fields:
+            pv_mesh.point_data["Pressure"] = self.input_mesh.fields["pressure"]
         pv_mesh.save(path)
         dpg.show_item("export_success")  # optional popup
\ No newline at end of file
@@ -0,0 +1,149 @@
+# scheduler.py
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from jobs import JobCancelled
+
+
+class GraphScheduler:
+    """Incremental evaluation of the node graph
+
+    Nodes are the values of app.nodes and every link (output_node, input_node)
+    in the links dict is an edge. A node is dirty when its parameters or any
+    of its upstream outputs changed since its last execute(). Evaluation runs
+    only dirty nodes, in topological order, and lets clean nodes hand their
+    existing outputs downstream.
+
+    Nodes run on a thread pool as soon as all of their inputs are clean, so
+    independent branches execute concurrently. Node code must route UI
+    writes through app.call_on_ui, which the render loop drains every frame.
+    """
+
+    def __init__(self, app, links, max_workers=None):
+        self.app = app
+        self.links = links
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="node")
+
+        # Dirty nodes waiting for their inputs, and nodes currently executing.
+        # Completion callbacks fire on pool threads, hence the lock
+        self._lock = threading.RLock()
+        self._pending = set()
+        self._running = set()
+
+    def upstream(self, node):
+        return [out for out, inp in self.links.values() if inp is node]
+
+    def downstream(self, node):
+        return [inp for out, inp in self.links.values() if out is node]
+
+    def _reachable(self, node, step):
+        seen = set()
+        pending = deque(step(node))
+        while pending:
+            current = pending.popleft()
+            if current in seen:
+                continue
+            seen.add(current)
+            pending.extend(step(current))
+        seen.discard(node)
+        return seen
+
+    def descendants(self, node):
+        return self._reachable(node, self.downstream)
+
+    def ancestors(self, node):
+        return self._reachable(node, self.upstream)
+
+    def topological_order(self, nodes=None):
+        """Kahn's algorithm over `nodes` (default: the whole graph)
+
+        Nodes on a cycle are left out with a warning, since no order can
+        satisfy their inputs.
+        """
+        nodes = list(self.app.nodes.values()) if nodes is None else list(nodes)
+        members = set(nodes)
+        indegree = {node: 0 for node in nodes}
+        for out, inp in self.links.values():
+            if out in members and inp in members:
+                indegree[inp] += 1
+
+        ready = deque(node for node in nodes if indegree[node] == 0)
+        order = []
+        while ready:
+            node = ready.popleft()
+            order.append(node)
+            for child in self.downstream(node):
+                if child in members:
+                    indegree[child] -= 1
+                    if indegree[child] == 0:
+                        ready.append(child)
+
+        if len(order) < len(nodes):
+            skipped = [node.name for node in nodes if indegree[node] > 0]
+            print(f"Warning: node graph has a cycle, skipping {skipped}")
+        return order
+
+    def mark_dirty(self, node):
+        """`node` changed: it and everything downstream of it is stale"""
+        with self._lock:
+            node.dirty = True
+            for child in self.descendants(node):
+                child.dirty = True
+
+    def run(self, node):
+        """Re-run `node`, after any stale ancestors, then its stale descendants"""
+        with self._lock:
+            self.mark_dirty(node)
+            self.evaluate(self.ancestors(node) | {node} | self.descendants(node))
+
+    def evaluate(self, nodes=None):
+        """Schedule the dirty nodes among `nodes` (default: the whole graph)
+
+        Returns immediately; nodes are dispatched as their inputs become clean.
+        """
+        with self._lock:
+            self._pending.update(node for node in self.topological_order(nodes) if node.dirty)
+            self._dispatch_ready()
+
+    def _dispatch_ready(self):
+        for node in list(self._pending):
+            # A done future runs _finished inline, and its nested dispatch
+            # may already have started nodes later in this snapshot
+            if node not in self._pending or node in self._running:
+                continue
+            upstream = self.upstream(node)
+            if any(up.dirty or up in self._running for up in upstream):
+                continue
+
+            # Cleared up front: marking the node dirty while it runs
+            # schedules it again instead of being lost
+            self._pending.discard(node)
+            self._running.add(node)
+            node.dirty = False
+            future = self.executor.submit(self._execute, node, upstream)
+            future.add_done_callback(lambda f, node=node: self._finished(node, f))
+
+    @staticmethod
+    def _execute(node, upstream):
+        node.input_hashes = [up.output_hash for up in upstream]
+        for up in upstream:
+            node.set_input(node.input_attr, up)
+        node.execute()
+
+    def _finished(self, node, future):
+        with self._lock:
+            self._running.discard(node)
+            if future.exception() is not None:
+                if not isinstance(future.exception(), JobCancelled):
+                    print(f"Error executing {node.name}: {future.exception()}")
+
+                # Failed nodes stay dirty, and so does everything below them
+                node.dirty = True
+                self._pending -= self.descendants(node)
+            elif node.dirty:
+                self._pending.add(node)
+            self._dispatch_ready()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
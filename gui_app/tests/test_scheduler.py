@@ -0,0 +1,87 @@
+import os
+import sys
+from concurrent.futures import Future
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from scheduler import GraphScheduler
+
+
+class InlineExecutor:
+    """Runs each job in submit(), so every future is already done when
+    add_done_callback is called and the callback fires inline"""
+
+    def submit(self, fn, *args):
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+class FakeNode:
+    input_attr = "input"
+
+    def __init__(self, name):
+        self.name = name
+        self.dirty = True
+        self.output_hash = None
+        self.runs = 0
+
+    def set_input(self, attr, node):
+        pass
+
+    def execute(self):
+        self.runs += 1
+        self.output_hash = f"{self.name}:{self.runs}"
+
+
+class FakeApp:
+    def __init__(self, nodes):
+        self.nodes = {node.name: node for node in nodes}
+
+
+def diamond():
+    """source → left, right → sink"""
+    source, left, right, sink = (FakeNode(name) for name in ("source", "left", "right", "sink"))
+    links = {1: (source, left), 2: (source, right), 3: (left, sink), 4: (right, sink)}
+    scheduler = GraphScheduler(FakeApp([source, left, right, sink]), links)
+    scheduler.executor = InlineExecutor()
+    return scheduler, (source, left, right, sink)
+
+
+def test_instant_futures_run_each_node_once():
+    scheduler, nodes = diamond()
+    scheduler.evaluate()
+    assert [node.runs for node in nodes] == [1, 1, 1, 1]
+    assert not any(node.dirty for node in nodes)
+
+
+def test_node_marked_dirty_while_running_reruns_once():
+    scheduler, (source, left, right, sink) = diamond()
+
+    # A parameter change lands while the first run of left is in progress
+    execute = left.execute
+
+    def execute_and_edit():
+        execute()
+        if left.runs == 1:
+            scheduler.mark_dirty(left)
+
+    left.execute = execute_and_edit
+    scheduler.evaluate()
+
+    assert [node.runs for node in (source, left, right, sink)] == [1, 2, 1, 1]
+    assert not any(node.dirty for node in (source, left, right, sink))
+
+
+def test_rerun_after_change_runs_only_stale_nodes():
+    scheduler, (source, left, right, sink) = diamond()
+    scheduler.evaluate()
+
+    scheduler.run(left)
+    assert [node.runs for node in (source, left, right, sink)] == [1, 2, 1, 2]
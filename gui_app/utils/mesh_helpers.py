@@ -0,0 +1,76 @@
+# utils/mesh_helpers.py
+import numpy as np
+import pymeshlab
+
+# Corners of the four faces of tet (0, 1, 2, 3), wound consistently
+TET_FACES = np.array([[1, 2, 3], [0, 3, 2], [0, 1, 3], [0, 2, 1]])
+
+
+def orient_cells(verts, cells):
+    """Swap two corners of negatively oriented tets so all faces point out"""
+    corners = verts[cells].astype(np.float64)
+    edges = corners[:, 1:] - corners[:, :1]
+    inverted = np.linalg.det(edges) < 0
+    if inverted.any():
+        cells = cells.copy()
+        cells[inverted, 2:4] = cells[inverted, 3:1:-1]
+    return cells
+
+
+def boundary_faces(cells):
+    """Outer skin of a tet mesh: the cell faces no other cell shares"""
+    faces = cells[:, TET_FACES].reshape(-1, 3)
+    if not len(faces):
+        return faces
+
+    # Interior faces appear twice with any corner order, so match them
+    # on their sorted corners, packed into one byte-string key per face
+    keys = np.ascontiguousarray(np.sort(faces, axis=1))
+    keys = keys.view(np.dtype((np.void, 3 * keys.itemsize))).ravel()
+    _, first, counts = np.unique(keys, return_index=True, return_counts=True)
+    return faces[np.sort(first[counts == 1])]
+
+
+def mesh_to_arrays(ml_mesh):
+    """Vertices and faces of a pymeshlab mesh, plus cells for volume meshes"""
+    arrays = {
+        "vertices": np.asarray(ml_mesh.vertex_matrix(), dtype=np.float64),
+        "faces": np.asarray(ml_mesh.face_matrix(), dtype=np.int32).reshape(-1, 3),
+    }
+    if ml_mesh.face_number() == 0 and hasattr(ml_mesh, "cell_matrix"):
+        arrays["cells"] = np.asarray(ml_mesh.cell_matrix(), dtype=np.int32)[:, :4]
+    return arrays
+
+
+def mesh_set_from_arrays(arrays):
+    """MeshSet holding the mesh described by mesh_to_arrays() output
+
+    pymeshlab meshes cannot hold cells, so a volume mesh comes back as its
+    boundary surface.
+    """
+    faces = arrays["faces"]
+    if len(faces) == 0 and len(arrays.get("cells", ())):
+        faces = boundary_faces(orient_cells(arrays["vertices"], arrays["cells"]))
+
+    ms = pymeshlab.MeshSet()
+    ms.add_mesh(pymeshlab.Mesh(vertex_matrix=np.asarray(arrays["vertices"], dtype=np.float64),
+                               face_matrix=np.asarray(faces, dtype=np.int32)))
+    return ms
+
+
+def tetrahedralize_surface(surface, flags):
+    """TetGen on a surface mesh, as mesh_to_arrays() output
+
+    Runs in a job's child process so a cancel can stop it mid-call. The
+    child unpickles this function by module, so it lives here rather than
+    in the node module, which would pull DearPyGui into every worker.
+    """
+    # Tetrahedralization adds a mesh to the set, so work on a fresh copy
+    mesh_set = surface.to_mesh_set()
+
+    # Ensure we have a watertight surface
+    mesh_set.compute_normal_for_point_clouds()  # just in case
+    mesh_set.remove_unreferenced_vertices()
+
+    mesh_set.generate_tetrahedralization_with_tetgen(flags=flags)
+    return mesh_to_arrays(mesh_set.current_mesh())
@@ -2,41 +2,350 @@
 import dearpygui.dearpygui as dpg
 import pymeshlab
 import numpy as np
+import hashlib
+import threading
+from collections import OrderedDict
+
+from utils.mesh_helpers import boundary_faces, orient_cells
 
 class Viewer3D:
-    def __init__(self):
+    LUT_SIZE = 256
+    LOD_CACHE_SIZE = 8  # decimated proxies kept, least recently shown dropped first
+    NAN_COLOR = (128.0, 128.0, 128.0)  # vertices whose scalar value is NaN
+
+    # colormap → (LUT_SIZE, 4) RGBA lookup table, shared by all viewers
+    _luts = {}
+
+    def __init__(self, call_on_ui=None):
+        # Runs a callable on the render thread; background work posts its
+        # results through it. Without one, callables run where posted
+        self.call_on_ui = call_on_ui or (lambda fn, *args, **kwargs: fn(*args, **kwargs))
         self.window_tag = "3D Viewer"
         self.plot_tag = "plot3d"
         self.mesh_actor = None
 
+        # What the mesh item currently holds, so updates can skip unchanged
+        # buffers and axis refits
+        self.vertices = None
+        self.faces = None
+        self.color = None
+        self.vertex_colors = None
+        self.wireframe = None
+        self.bounds = None
+
+        # Last scalar field normalized to [0, 1] over its range
+        self._field = None
+        self._field_range = None
+        self._field_normalized = None
+
+        # Level of detail: meshes above triangle_budget are drawn as a
+        # decimated proxy until full resolution is requested
+        self.triangle_budget = 250_000
+        self.full_resolution = False
+        self._lod_cache = OrderedDict()  # mesh hash → (proxy faces, source vertex ids), LRU
+        self._lod_building = set()
+        self._proxy_source = None    # source vertex ids of the proxy on screen
+        self._last_load = None       # full-resolution buffers of the last load
+
     def show(self):
         if not dpg.does_item_exist(self.window_tag):
             with dpg.window(label="3D Viewer", width=800, height=600, tag=self.window_tag, pos=[100, 100]):
+                dpg.add_checkbox(label="Full resolution", default_value=self.full_resolution,
+                                 callback=lambda sender, value: self.set_full_resolution(value))
                 with dpg.plot(no_title_bar=True, width=-1, height=-1):
                     dpg.add_plot_3d(tag=self.plot_tag, width=-1, height=-1,
                                     query=True, pan=True)
 
-    def load_mesh(self, ml_mesh, wireframe=False, opacity=1.0):
+    @classmethod
+    def mesh_buffers(cls, ml_mesh, clip_plane=None):
+        """Contiguous float32 vertex and uint32 index buffers for a pymeshlab mesh
+
+        DearPyGui reads buffer-protocol objects directly, so these go to the
+        mesh item without ever becoming Python lists of floats. Tet meshes
+        are reduced to their boundary triangles, after clipping the cells so
+        a cut shows the interior as a closed slab.
+        """
+        verts = np.ascontiguousarray(ml_mesh.vertex_matrix(), dtype=np.float32)
+        if ml_mesh.face_number() > 0:
+            faces = np.ascontiguousarray(ml_mesh.face_matrix(), dtype=np.uint32)
+            if clip_plane is not None:
+                faces = faces[cls.clip_mask(verts, faces, clip_plane)]
+        else:
+            cells = np.ascontiguousarray(ml_mesh.cell_matrix()[:, :4], dtype=np.uint32)
+            if clip_plane is not None:
+                cells = cells[cls.clip_mask(verts, cells, clip_plane)]
+            faces = boundary_faces(orient_cells(verts, cells))
+        return verts, faces
+
+    @classmethod
+    def colormap_lut(cls, colormap):
+        """256-entry RGBA lookup table for a DearPyGui colormap, built once"""
+        lut = cls._luts.get(colormap)
+        if lut is None:
+            samples = [dpg.sample_colormap(colormap, t) for t in np.linspace(0.0, 1.0, cls.LUT_SIZE)]
+            lut = np.asarray(samples, dtype=np.float32)
+            if lut.max() <= 1.0:
+                lut *= 255.0  # Same 0-255 scale as the mesh color
+            cls._luts[colormap] = lut
+        return lut
+
+    @staticmethod
+    def clip_mask(verts, elements, clip_plane):
+        """Elements entirely at or below z = clip_plane, or entirely inside
+        the slab lo <= z <= hi when clip_plane is a (lo, hi) pair"""
+        z = verts[elements, 2]
+        if np.ndim(clip_plane) == 0:
+            return z.max(axis=1) <= clip_plane
+        lo, hi = clip_plane
+        return (z.min(axis=1) >= lo) & (z.max(axis=1) <= hi)
+
+    def normalize_field(self, scalar_field, scalar_range=None):
+        """Per-vertex values scaled to [0, 1] over scalar_range, cached
+
+        The default range spans the finite values; NaNs stay NaN.
+        """
+        field = np.asarray(scalar_field, dtype=np.float32).ravel()
+        if scalar_range is None:
+            finite = field[np.isfinite(field)]
+            scalar_range = (float(finite.min()), float(finite.max())) if len(finite) else (0.0, 1.0)
+        scalar_range = tuple(scalar_range)
+
+        if scalar_range == self._field_range and np.array_equal(field, self._field, equal_nan=True):
+            return self._field_normalized
+
+        lo, hi = scalar_range
+        scale = 1.0 / (hi - lo) if hi > lo else 0.0
+        self._field = field
+        self._field_range = scalar_range
+        self._field_normalized = np.clip((field - lo) * scale, 0.0, 1.0)
+        return self._field_normalized
+
+    def map_scalars(self, scalar_field, colormap=None, scalar_range=None, opacity=1.0):
+        """(N, 4) per-vertex colors from a scalar field through a colormap LUT"""
+        if colormap is None:
+            colormap = dpg.mvPlotColormap_Viridis
+        normalized = self.normalize_field(scalar_field, scalar_range)
+        missing = np.isnan(normalized)
+        index = (np.where(missing, 0.0, normalized) * (self.LUT_SIZE - 1)).astype(np.intp)
+
+        colors = self.colormap_lut(colormap)[index]
+        colors[missing, :3] = self.NAN_COLOR
+        colors[:, 3] = 255.0 * opacity
+        return colors
+
+    def load_mesh(self, ml_mesh, wireframe=False, opacity=1.0, color=None,
+                  scalar_field=None, colormap=None, scalar_range=None, clip_plane=None):
         self.show()
-        verts = np.array(ml_mesh.vertex_matrix(), dtype=float)
-        faces = np.array(ml_mesh.face_matrix(), dtype=int) if ml_mesh.face_number() > 0 \
-                else np.array(ml_mesh.cell_matrix()[:, :4], dtype=int)  # tet faces
-
-        if self.mesh_actor:
-            dpg.delete_item(self.mesh_actor)
-
-        flat_faces = faces.flatten()
-        color = [100, 180, 255, int(255 * opacity)]
-
-        self.mesh_actor = dpg.add_mesh(
-            parent=self.plot_tag,
-            vertices=verts.tolist(),
-            faces=flat_faces.tolist(),
-            face_count=len(faces),
-            color=color,
-            shading=True,
-            wireframe=wireframe
-        )
+        verts, faces = self.mesh_buffers(ml_mesh, clip_plane)
+
+        if color is None:
+            color = [100, 180, 255, int(255 * opacity)]
+
+        vertex_colors = None
+        if scalar_field is not None:
+            vertex_colors = self.map_scalars(scalar_field, colormap, scalar_range, opacity)
+
+        self._last_load = dict(verts=verts, faces=faces, color=color,
+                               vertex_colors=vertex_colors, wireframe=wireframe)
+        self._display_lod(**self._last_load)
+
+    def set_full_resolution(self, full_resolution=True):
+        """Swap between the decimated proxy and the full mesh"""
+        self.full_resolution = full_resolution
+        if self._last_load is not None:
+            self._display_lod(**self._last_load)
+
+    @staticmethod
+    def mesh_key(verts, faces):
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(verts.tobytes())
+        digest.update(faces.tobytes())
+        return digest.hexdigest()
+
+    def _display_lod(self, verts, faces, color, vertex_colors, wireframe):
+        """Show the mesh, or a proxy within triangle_budget if it is too big"""
+        if self.full_resolution or len(faces) <= self.triangle_budget:
+            self._proxy_source = None
+            self._display(verts, faces, color, vertex_colors, wireframe)
+            return
+
+        key = self.mesh_key(verts, faces)
+        proxy = self._lod_cache.get(key)
+        if proxy is not None:
+            self._lod_cache.move_to_end(key)
+        else:
+            # Every n-th face until the decimated proxy is ready
+            self._build_proxy_async(key, verts, faces)
+            self._proxy_source = None
+            stride = -(-len(faces) // self.triangle_budget)
+            self._display(verts, faces[::stride], color, vertex_colors, wireframe)
+            return
+
+        proxy_faces, source = proxy
+        self._proxy_source = source
+        self._display(verts[source], proxy_faces, color,
+                      vertex_colors[source] if vertex_colors is not None else None, wireframe)
+
+    def _build_proxy_async(self, key, verts, faces):
+        if key in self._lod_building:
+            return
+        self._lod_building.add(key)
+
+        def build():
+            proxy = None
+            try:
+                proxy = self.decimate(verts, faces, self.triangle_budget)
+            finally:
+                # The render thread owns the cache and the mesh item
+                self.call_on_ui(self._proxy_ready, key, proxy, verts, faces)
+
+        threading.Thread(target=build, daemon=True).start()
+
+    def _proxy_ready(self, key, proxy, verts, faces):
+        """Cache a finished proxy and swap it in if its mesh is still on screen"""
+        self._lod_building.discard(key)
+        if proxy is None:
+            return
+
+        self._lod_cache[key] = proxy
+        while len(self._lod_cache) > self.LOD_CACHE_SIZE:
+            self._lod_cache.popitem(last=False)
+
+        last = self._last_load
+        if last is not None and last["verts"] is verts and last["faces"] is faces:
+            self._display_lod(**last)
+
+    @staticmethod
+    def decimate(verts, faces, target_faces):
+        """Quadric edge-collapse proxy as (faces, source vertex ids)
+
+        Without optimal placement every surviving vertex keeps its original
+        position, so it can be matched back to the source vertex and carry
+        that vertex's per-vertex colors.
+        """
+        ms = pymeshlab.MeshSet()
+        ms.add_mesh(pymeshlab.Mesh(vertex_matrix=verts.astype(np.float64),
+                                   face_matrix=faces.astype(np.int32)))
+        ms.meshing_decimation_quadric_edge_collapse(targetfacenum=target_faces,
+                                                    optimalplacement=False,
+                                                    preservetopology=True)
+        proxy = ms.current_mesh()
+
+        # Match proxy vertices to source vertices by their exact coordinates
+        as_keys = lambda a: np.ascontiguousarray(a, dtype=np.float32).view(np.dtype((np.void, 12))).ravel()
+        keys = as_keys(verts)
+        order = np.argsort(keys)
+        pos = np.searchsorted(keys[order], as_keys(proxy.vertex_matrix()))
+        source = order[np.clip(pos, 0, len(order) - 1)]
+
+        return np.ascontiguousarray(proxy.face_matrix(), dtype=np.uint32), source
+
+    def _display(self, verts, faces, color, vertex_colors, wireframe):
+        if not (self.mesh_actor and dpg.does_item_exist(self.mesh_actor)):
+            self.mesh_actor = dpg.add_mesh(
+                parent=self.plot_tag,
+                vertices=verts,
+                faces=faces.ravel(),
+                face_count=len(faces),
+                color=color,
+                shading=True,
+                wireframe=wireframe
+            )
+            self.vertices, self.faces = verts, faces
+            self.color, self.wireframe = list(color), wireframe
+            self.vertex_colors = None
+            self._apply(self._vertex_color_changes(vertex_colors))
+            self.bounds = None
+            self._fit_axes(verts)
+            return
+
+        # Same item, only re-upload what differs from the last load, in one
+        # configure call so vertices and faces never mismatch on screen
+        changes = {}
+        if not np.array_equal(faces, self.faces):
+            self.faces = faces
+            changes.update(faces=faces.ravel(), face_count=len(faces))
+        changes.update(self._vertex_changes(verts))
+        changes.update(self._color_changes(color))
+        changes.update(self._vertex_color_changes(vertex_colors))
+        changes.update(self._wireframe_changes(wireframe))
+        self._apply(changes)
+
+    def update_vertices(self, verts):
+        """Move the existing mesh's vertices; topology is unchanged"""
+        verts = np.ascontiguousarray(verts, dtype=np.float32)
+        self._remember(verts=verts)
+        if self._proxy_source is not None:
+            verts = verts[self._proxy_source]
+        self._apply(self._vertex_changes(verts))
+
+    def update_colors(self, color):
+        """Recolor the existing mesh without touching its geometry"""
+        self._remember(color=color)
+        self._apply(self._color_changes(color))
+
+    def update_scalar_field(self, scalar_field, colormap=None, scalar_range=None, opacity=1.0):
+        """Recolor by a per-vertex field; a new range or colormap reuses the
+        cached field and only re-uploads the colors"""
+        vertex_colors = self.map_scalars(scalar_field, colormap, scalar_range, opacity)
+        self._remember(vertex_colors=vertex_colors)
+        if self._proxy_source is not None:
+            vertex_colors = vertex_colors[self._proxy_source]
+        self._apply(self._vertex_color_changes(vertex_colors))
+
+    def set_wireframe(self, wireframe):
+        self._remember(wireframe=wireframe)
+        self._apply(self._wireframe_changes(wireframe))
+
+    def _remember(self, **values):
+        """Keep the full-resolution state in step with incremental updates"""
+        if self._last_load is not None:
+            self._last_load.update(values)
+
+    def _vertex_changes(self, verts):
+        verts = np.ascontiguousarray(verts, dtype=np.float32)
+        if np.array_equal(verts, self.vertices):
+            return {}
+        self.vertices = verts
+        return {"vertices": verts}
+
+    def _color_changes(self, color):
+        color = list(color)
+        if color == self.color:
+            return {}
+        self.color = color
+        return {"color": color}
+
+    def _vertex_color_changes(self, vertex_colors):
+        if vertex_colors is None and self.vertex_colors is None:
+            return {}
+        if vertex_colors is not None and np.array_equal(vertex_colors, self.vertex_colors):
+            return {}
+        self.vertex_colors = vertex_colors
+        # An empty buffer switches back to the solid mesh color
+        return {"vertex_colors": vertex_colors if vertex_colors is not None
+                else np.empty((0, 4), dtype=np.float32)}
+
+    def _wireframe_changes(self, wireframe):
+        if wireframe == self.wireframe:
+            return {}
+        self.wireframe = wireframe
+        return {"wireframe": wireframe}
+
+    def _apply(self, changes):
+        if not changes or not self.mesh_actor:
+            return
+        dpg.configure_item(self.mesh_actor, **changes)
+        if "vertices" in changes:
+            self._fit_axes(changes["vertices"])
+
+    def _fit_axes(self, verts):
+        """Refit all three axes, unless the bounds are the ones already fitted"""
+        bounds = (verts.min(axis=0), verts.max(axis=0)) if len(verts) else None
+        if bounds is not None and self.bounds is not None \
+                and all(np.array_equal(a, b) for a, b in zip(bounds, self.bounds)):
+            return
+        self.bounds = bounds
 
         # Auto-fit view
         for axis in (dpg.mvXAxis, dpg.mvYAxis, dpg.mvZAxis):
@@ -46,4 +355,4 @@ class Viewer3D:
         pass
 
 # Global instance
-viewer_3d = Viewer3D()
\ No newline at end of file
+viewer_3d = Viewer3D()
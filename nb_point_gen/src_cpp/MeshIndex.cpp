@@ -0,0 +1,128 @@
+#include <MeshIndex.hpp>
+#include <PointGenerator.hpp>
+
+#include <algorithm>
+#include <cmath>
+
+namespace cpp_fns {
+
+MeshIndex::MeshIndex(const Eigen::MatrixXd& vertices,
+                     const Eigen::MatrixXi& faces,
+                     int cells_per_axis)
+{
+    const Eigen::Index num_faces = faces.rows();
+
+    m_v0.resize(num_faces, 3);
+    m_v1.resize(num_faces, 3);
+    m_v2.resize(num_faces, 3);
+    for (Eigen::Index ii = 0; ii < num_faces; ++ii) {
+        m_v0.row(ii) = vertices.row(faces(ii, 0));
+        m_v1.row(ii) = vertices.row(faces(ii, 1));
+        m_v2.row(ii) = vertices.row(faces(ii, 2));
+    }
+
+    Eigen::MatrixX3d tri_min = m_v0.cwiseMin(m_v1).cwiseMin(m_v2);
+    Eigen::MatrixX3d tri_max = m_v0.cwiseMax(m_v1).cwiseMax(m_v2);
+
+    // Pad boxes so round-off in the intersection test never hits a face the
+    // grid has filtered out
+    Eigen::Vector3d extent = Eigen::Vector3d::Ones();
+    if (vertices.rows() > 0) {
+        extent = vertices.colwise().maxCoeff() - vertices.colwise().minCoeff();
+        m_grid_min = vertices.colwise().minCoeff().tail<2>();
+    }
+    m_pad = 1.0e-9 * std::max(extent.maxCoeff(), 1.0);
+    m_max_x = tri_max.col(0).array() + m_pad;
+
+    // Aim for about one face per cell
+    if (cells_per_axis <= 0) {
+        cells_per_axis = static_cast<int>(
+          std::sqrt(static_cast<double>(std::max<Eigen::Index>(num_faces, 1))));
+    }
+    m_cells_per_axis = std::max(cells_per_axis, 1);
+
+    for (int axis = 0; axis < 2; ++axis) {
+        double yz_extent = extent(axis + 1);
+        m_cell_size(axis) = yz_extent > 0.0 ? yz_extent / m_cells_per_axis : 1.0;
+    }
+
+    // Count, then fill, the faces covering every cell
+    const int num_cells = m_cells_per_axis * m_cells_per_axis;
+    m_cell_start.assign(num_cells + 1, 0);
+
+    auto for_each_cell = [&](Eigen::Index face, auto&& visit) {
+        int y_lo = cell_coord(tri_min(face, 1) - m_pad, 0);
+        int y_hi = cell_coord(tri_max(face, 1) + m_pad, 0);
+        int z_lo = cell_coord(tri_min(face, 2) - m_pad, 1);
+        int z_hi = cell_coord(tri_max(face, 2) + m_pad, 1);
+        for (int cy = y_lo; cy <= y_hi; ++cy) {
+            for (int cz = z_lo; cz <= z_hi; ++cz) {
+                visit(cy * m_cells_per_axis + cz);
+            }
+        }
+    };
+
+    for (Eigen::Index ii = 0; ii < num_faces; ++ii) {
+        for_each_cell(ii, [&](int cell) { m_cell_start[cell + 1]++; });
+    }
+    for (int cell = 0; cell < num_cells; ++cell) {
+        m_cell_start[cell + 1] += m_cell_start[cell];
+    }
+
+    m_cell_faces.resize(m_cell_start[num_cells]);
+    std::vector<int> fill(m_cell_start.begin(), m_cell_start.end() - 1);
+    for (Eigen::Index ii = 0; ii < num_faces; ++ii) {
+        for_each_cell(ii, [&](int cell) {
+            m_cell_faces[fill[cell]++] = static_cast<int>(ii);
+        });
+    }
+}
+
+int
+MeshIndex::cell_coord(double value, int axis) const
+{
+    int coord =
+      static_cast<int>(std::floor((value - m_grid_min(axis)) / m_cell_size(axis)));
+    return std::clamp(coord, 0, m_cells_per_axis - 1);
+}
+
+std::vector<int>
+MeshIndex::candidate_faces(const Eigen::Vector3d& point) const
+{
+    std::vector<int> candidates;
+
+    for (int axis = 0; axis < 2; ++axis) {
+        double grid_max = m_grid_min(axis) + m_cell_size(axis) * m_cells_per_axis;
+        double value = point(axis + 1);
+        if (value < m_grid_min(axis) - m_pad || value > grid_max + m_pad) {
+            return candidates;
+        }
+    }
+
+    int cell = cell_coord(point.y(), 0) * m_cells_per_axis + cell_coord(point.z(), 1);
+    for (int ii = m_cell_start[cell]; ii < m_cell_start[cell + 1]; ++ii) {
+        int face = m_cell_faces[ii];
+        if (m_max_x(face) >= point.x()) {
+            candidates.push_back(face);
+        }
+    }
+
+    return candidates;
+}
+
+bool
+MeshIndex::is_point_inside(const Eigen::Vector3d& point) const
+{
+    int intersections = 0;
+
+    for (int face : candidate_faces(point)) {
+        if (PointGenerator::ray_crosses_triangle(
+              point, m_v0.row(face), m_v1.row(face), m_v2.row(face))) {
+            intersections++;
+        }
+    }
+
+    return intersections % 2 == 1;
+}
+
+} // namespace cpp_fns
@@ -0,0 +1,62 @@
+#pragma once
+
+#include <Eigen/Dense>
+#include <vector>
+
+namespace cpp_fns {
+
+// Uniform grid over the YZ plane of a triangle mesh for +X ray casting.
+//
+// A +X ray from a point can only hit triangles whose YZ footprint covers the
+// point and that reach past it in X. Triangles are binned once into the grid
+// cells their YZ bounding box overlaps, so a query only visits the faces of
+// one cell instead of the whole mesh.
+class MeshIndex
+{
+  public:
+    MeshIndex(const Eigen::MatrixXd& vertices,
+              const Eigen::MatrixXi& faces,
+              int cells_per_axis = 0);
+
+    // Indices of the faces a +X ray from point may cross
+    std::vector<int>
+    candidate_faces(const Eigen::Vector3d& point) const;
+
+    bool
+    is_point_inside(const Eigen::Vector3d& point) const;
+
+    int
+    num_faces() const
+    {
+        return static_cast<int>(m_v0.rows());
+    }
+
+    int
+    cells_per_axis() const
+    {
+        return m_cells_per_axis;
+    }
+
+  private:
+    int
+    cell_coord(double value, int axis) const;
+
+    // Per-face corners, copied so the index does not depend on the caller
+    // keeping the input matrices alive
+    Eigen::MatrixX3d m_v0;
+    Eigen::MatrixX3d m_v1;
+    Eigen::MatrixX3d m_v2;
+    Eigen::VectorXd m_max_x;
+
+    int m_cells_per_axis = 1;
+    double m_pad = 0.0;
+    Eigen::Vector2d m_grid_min = Eigen::Vector2d::Zero();
+    Eigen::Vector2d m_cell_size = Eigen::Vector2d::Ones();
+
+    // Compressed per-cell face lists: faces of cell c are
+    // m_cell_faces[m_cell_start[c] .. m_cell_start[c + 1])
+    std::vector<int> m_cell_start;
+    std::vector<int> m_cell_faces;
+};
+
+} // namespace cpp_fns
@@ -1,5 +1,11 @@
 #include <PointGenerator.hpp>
+#include <algorithm>
+#include <atomic>
+#include <chrono>
+#include <condition_variable>
 #include <iostream>
+#include <mutex>
+#include <thread>
 
 namespace cpp_fns {
 
@@ -23,46 +29,55 @@ PointGenerator::point_in_triangle(const Eigen::Vector3d& p1,
 }
 
 bool
-PointGenerator::is_point_inside_mesh(const Eigen::Vector3d& point,
-                                     const Eigen::MatrixXd& vertices,
-                                     const Eigen::MatrixXi& faces)
+PointGenerator::ray_crosses_triangle(const Eigen::Vector3d& point,
+                                     const Eigen::Vector3d& v0,
+                                     const Eigen::Vector3d& v1,
+                                     const Eigen::Vector3d& v2)
 {
     Eigen::Vector3d ray_dir(1.0, 0.0, 0.0);
-    int intersections = 0;
 
-    for (int ii = 0; ii < faces.rows(); ++ii) {
-        Eigen::Vector3d v0 = vertices.row(faces(ii, 0));
-        Eigen::Vector3d v1 = vertices.row(faces(ii, 1));
-        Eigen::Vector3d v2 = vertices.row(faces(ii, 2));
+    Eigen::Vector3d edge1 = v1 - v0;
+    Eigen::Vector3d edge2 = v2 - v0;
 
-        Eigen::Vector3d edge1 = v1 - v0;
-        Eigen::Vector3d edge2 = v2 - v0;
+    Eigen::Vector3d h = ray_dir.cross(edge2);
+    double a = edge1.dot(h);
 
-        Eigen::Vector3d h = ray_dir.cross(edge2);
-        double a = edge1.dot(h);
+    if (std::abs(a) < 1.0e-8) {
+        return false;
+    }
 
-        if (std::abs(a) < 1.0e-8) {
-            continue;
-        }
+    double f = 1.0 / a;
+    Eigen::Vector3d s = point - v0;
+    double u = f * s.dot(h);
 
-        double f = 1.0 / a;
-        Eigen::Vector3d s = point - v0;
-        double u = f * s.dot(h);
+    if (u < 0.0 || u > 1.0) {
+        return false;
+    }
 
-        if (u < 0.0 || u > 1.0) {
-            continue;
-        }
+    Eigen::Vector3d q = s.cross(edge1);
+    double v = f * ray_dir.dot(q);
+
+    if (v < 0.0 || u + v > 1.0) {
+        return false;
+    }
 
-        Eigen::Vector3d q = s.cross(edge1);
-        double v = f * ray_dir.dot(q);
+    double t = f * edge2.dot(q);
 
-        if (v < 0.0 || u + v > 1.0) {
-            continue;
-        }
+    return t > 1.0e-8; // Ray intersects triangle
+}
 
-        double t = f * edge2.dot(q);
+bool
+PointGenerator::is_point_inside_mesh(const Eigen::Vector3d& point,
+                                     const Eigen::MatrixXd& vertices,
+                                     const Eigen::MatrixXi& faces)
+{
+    int intersections = 0;
 
-        if (t > 1.0e-8) { // Ray intersects triangle
+    for (int ii = 0; ii < faces.rows(); ++ii) {
+        if (ray_crosses_triangle(point,
+                                 vertices.row(faces(ii, 0)),
+                                 vertices.row(faces(ii, 1)),
+                                 vertices.row(faces(ii, 2)))) {
             intersections++;
         }
     }
@@ -70,52 +85,144 @@ PointGenerator::is_point_inside_mesh(const Eigen::Vector3d& point,
     return intersections % 2 == 1;
 }
 
+bool
+PointGenerator::is_point_inside_mesh(const Eigen::Vector3d& point,
+                                     const MeshIndex& index)
+{
+    return index.is_point_inside(point);
+}
+
 Eigen::MatrixXd
 PointGenerator::generate_interior_points(
   const Eigen::MatrixXd& vertices,
   const Eigen::MatrixXi& faces,
   int num_points,
-  std::function<void(int, int)> progress_callback)
+  std::function<void(int, int)> progress_callback,
+  std::optional<std::uint32_t> seed,
+  int num_threads,
+  double progress_interval)
 {
-    if (vertices.rows() == 0) {
+    if (vertices.rows() == 0 || num_points <= 0) {
         return Eigen::MatrixXd::Zero(0, 3); // Return an empty 0x3 matrix
     }
 
+    // Build the spatial index once and share it read-only between workers
+    MeshIndex index(vertices, faces);
+
     // Get bounding box
     Eigen::Vector3d min_bounds = vertices.colwise().minCoeff();
     Eigen::Vector3d max_bounds = vertices.colwise().maxCoeff();
 
-    std::vector<Eigen::Vector3d> interior_points;
-    interior_points.reserve(num_points); // Pre-allocate memory
+    const std::uint32_t base_seed = seed ? *seed : std::random_device{}();
+    const std::int64_t max_attempts =
+      static_cast<std::int64_t>(num_points) * 100; // Prevent infinite loops
+    const std::int64_t block_size = 4096;
+    const std::int64_t num_blocks = (max_attempts + block_size - 1) / block_size;
+
+    if (num_threads <= 0) {
+        num_threads = static_cast<int>(std::thread::hardware_concurrency());
+    }
+    num_threads = static_cast<int>(
+      std::clamp<std::int64_t>(num_threads, 1, num_blocks));
+
+    // Accepted points of each block, filled in whatever order the workers
+    // finish and stitched together in block order at the end
+    std::vector<std::vector<Eigen::Vector3d>> block_points(num_blocks);
+    std::atomic<std::int64_t> next_block{ 0 };
+    std::atomic<int> num_found{ 0 };
+    std::atomic<bool> stop{ false };
+
+    std::mutex done_mutex;
+    std::condition_variable done_cv;
+    int num_running = num_threads;
+
+    auto worker = [&]() {
+        while (!stop.load(std::memory_order_relaxed)) {
+            std::int64_t block = next_block.fetch_add(1);
+            if (block >= num_blocks) {
+                break;
+            }
+
+            std::seed_seq seq{ base_seed,
+                               static_cast<std::uint32_t>(block),
+                               static_cast<std::uint32_t>(block >> 32) };
+            std::mt19937 rng(seq);
+            std::uniform_real_distribution<double> x_dist(min_bounds.x(), max_bounds.x());
+            std::uniform_real_distribution<double> y_dist(min_bounds.y(), max_bounds.y());
+            std::uniform_real_distribution<double> z_dist(min_bounds.z(), max_bounds.z());
+
+            std::int64_t attempts =
+              std::min(block_size, max_attempts - block * block_size);
+            std::vector<Eigen::Vector3d>& accepted = block_points[block];
+
+            for (std::int64_t ii = 0; ii < attempts; ++ii) {
+                // Generate random point in bounding box
+                Eigen::Vector3d point(x_dist(rng), y_dist(rng), z_dist(rng));
+                if (index.is_point_inside(point)) {
+                    accepted.push_back(point);
+                }
+            }
 
-    std::mt19937 local_rng(std::random_device{}()); // Use a local RNG for generate_interior_points
-    // Ensure uniform_real_distribution uses the min and max bounds for each dimension
-    std::uniform_real_distribution<double> x_dist(min_bounds.x(), max_bounds.x());
-    std::uniform_real_distribution<double> y_dist(min_bounds.y(), max_bounds.y());
-    std::uniform_real_distribution<double> z_dist(min_bounds.z(), max_bounds.z());
+            // Blocks are handed out in order, so once enough points are found
+            // every block of the final prefix is already claimed by a worker
+            int total = num_found.fetch_add(static_cast<int>(accepted.size())) +
+                        static_cast<int>(accepted.size());
+            if (total >= num_points) {
+                stop.store(true, std::memory_order_relaxed);
+            }
+        }
 
-    int attempts = 0;
-    int max_attempts = num_points * 100; // Prevent infinite loops
+        std::lock_guard<std::mutex> lock(done_mutex);
+        num_running--;
+        done_cv.notify_all();
+    };
+
+    std::vector<std::thread> threads;
+    threads.reserve(num_threads);
+    for (int ii = 0; ii < num_threads; ++ii) {
+        threads.emplace_back(worker);
+    }
 
-    while (static_cast<int>(interior_points.size()) < num_points && attempts < max_attempts) {
-        // Generate random point in bounding box
-        Eigen::Vector3d point(x_dist(local_rng), y_dist(local_rng), z_dist(local_rng));
+    // Report progress from the calling thread, throttled by wall time
+    try {
+        auto interval = std::chrono::duration<double>(progress_interval);
+        std::unique_lock<std::mutex> lock(done_mutex);
+        while (!done_cv.wait_for(lock, interval, [&] { return num_running == 0; })) {
+            if (progress_callback) {
+                lock.unlock();
+                progress_callback(std::min(num_found.load(), num_points), num_points);
+                lock.lock();
+            }
+        }
+    } catch (...) {
+        // The callback threw (e.g. a Python exception); stop the workers
+        // before letting it propagate
+        stop = true;
+        for (auto& thread : threads) {
+            thread.join();
+        }
+        throw;
+    }
 
-        if (PointGenerator::is_point_inside_mesh(point, vertices, faces)) {
-            interior_points.push_back(point);
+    for (auto& thread : threads) {
+        thread.join();
+    }
 
-            // Report progress every 10 points
-            if (progress_callback && interior_points.size() % 10 == 0) {
-                progress_callback(static_cast<int>(interior_points.size()), num_points);
+    // Concatenate the leading blocks up to num_points
+    int total = std::min(num_found.load(), num_points);
+    Eigen::MatrixXd result(total, 3);
+    int row = 0;
+    for (const auto& accepted : block_points) {
+        for (const auto& point : accepted) {
+            if (row == total) {
+                break;
             }
+            result.row(row++) = point;
         }
-        attempts++;
     }
 
-    // Convert std::vector<Eigen::Vector3d> to Eigen::MatrixXd
-    Eigen::MatrixXd result(interior_points.size(), 3);
-    for (size_t i = 0; i < interior_points.size(); ++i) {
-        result.row(i) = interior_points[i];
+    if (progress_callback) {
+        progress_callback(total, num_points);
     }
 
     return result;
@@ -1,7 +1,10 @@
 #pragma once
 
 #include <Eigen/Dense>
+#include <MeshIndex.hpp>
+#include <cstdint>
 #include <functional>
+#include <optional>
 #include <random>
 #include <vector>
 
@@ -15,17 +18,36 @@ class PointGenerator
                       const Eigen::Vector3d& p2,
                       const Eigen::Vector3d& p3);
 
+    static bool
+    ray_crosses_triangle(const Eigen::Vector3d& point,
+                         const Eigen::Vector3d& v0,
+                         const Eigen::Vector3d& v1,
+                         const Eigen::Vector3d& v2);
+
     static bool
     is_point_inside_mesh(const Eigen::Vector3d& point,
                          const Eigen::MatrixXd& vertices,
                          const Eigen::MatrixXi& faces);
 
+    static bool
+    is_point_inside_mesh(const Eigen::Vector3d& point, const MeshIndex& index);
+
+    // Rejection sampling on num_threads workers (0 = hardware concurrency).
+    //
+    // Candidates are drawn in fixed-size blocks, each with its own RNG stream
+    // seeded from (seed, block index), and accepted points are kept in block
+    // order, so a given seed gives the same points for any thread count.
+    // progress_callback is only ever invoked on the calling thread, at most
+    // once every progress_interval seconds.
     static Eigen::MatrixXd
     generate_interior_points(
       const Eigen::MatrixXd& vertices,
       const Eigen::MatrixXi& faces,
       int num_points,
-      std::function<void(int, int)> progress_callback = nullptr);
+      std::function<void(int, int)> progress_callback = nullptr,
+      std::optional<std::uint32_t> seed = std::nullopt,
+      int num_threads = 0,
+      double progress_interval = 0.1);
 
   private:
     static std::mt19937 s_rng;
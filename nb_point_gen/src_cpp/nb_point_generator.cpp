@@ -1,5 +1,7 @@
 #include <nanobind/eigen/dense.h>
 #include <nanobind/nanobind.h>
+#include <nanobind/stl/optional.h>
+#include <nanobind/stl/vector.h>
 
 #include <PointGenerator.hpp>
 
@@ -9,6 +11,23 @@ NB_MODULE(point_generator_cpp, m)
 {
     m.doc() = "nanobind plugin";
 
+    nb::class_<cpp_fns::MeshIndex>(m, "MeshIndex")
+      .def(nb::init<const Eigen::MatrixXd&, const Eigen::MatrixXi&, int>(),
+           nb::arg("vertices").noconvert(),
+           nb::arg("faces").noconvert(),
+           nb::arg("cells_per_axis") = 0,
+           "Build a YZ grid over the mesh faces for repeated ray casting")
+      .def("candidate_faces",
+           &cpp_fns::MeshIndex::candidate_faces,
+           nb::arg("point").noconvert(),
+           "Indices of the faces a +X ray from point may cross")
+      .def("is_point_inside",
+           &cpp_fns::MeshIndex::is_point_inside,
+           nb::arg("point").noconvert(),
+           "Ray casting algorithm to check if point is inside mesh")
+      .def_prop_ro("num_faces", &cpp_fns::MeshIndex::num_faces)
+      .def_prop_ro("cells_per_axis", &cpp_fns::MeshIndex::cells_per_axis);
+
     nb::class_<cpp_fns::PointGenerator>(m, "PointGenerator")
       .def_static(
         "point_in_triangle",
@@ -18,32 +37,60 @@ NB_MODULE(point_generator_cpp, m)
         nb::arg("p3").noconvert(),
         "Generate random point inside triangle using barycentric coordinates")
       .def_static("is_point_inside_mesh",
-                  &cpp_fns::PointGenerator::is_point_inside_mesh,
+                  nb::overload_cast<const Eigen::Vector3d&,
+                                    const Eigen::MatrixXd&,
+                                    const Eigen::MatrixXi&>(
+                    &cpp_fns::PointGenerator::is_point_inside_mesh),
                   nb::arg("point").noconvert(),
                   nb::arg("vertices").noconvert(),
                   nb::arg("faces").noconvert(),
                   "Ray casting algorithm to check if point is inside mesh")
+      .def_static("is_point_inside_mesh",
+                  nb::overload_cast<const Eigen::Vector3d&,
+                                    const cpp_fns::MeshIndex&>(
+                    &cpp_fns::PointGenerator::is_point_inside_mesh),
+                  nb::arg("point").noconvert(),
+                  nb::arg("index"),
+                  "Ray casting against a prebuilt MeshIndex")
       .def_static(
         "generate_interior_points",
         [](const Eigen::MatrixXd& vertices,
            const Eigen::MatrixXi& faces,
            int num_points,
-           nb::object progress_callback) {
-            // Wrap the Python callable as a std::function
+           nb::object progress_callback,
+           std::optional<std::uint32_t> seed,
+           int num_threads,
+           double progress_interval) {
+            // Wrap the Python callable as a std::function. Capture it by
+            // reference so copies of the std::function made without the GIL
+            // never touch its reference count
             std::function<void(int, int)> cpp_callback = nullptr;
             if (!progress_callback.is_none()) {
-                cpp_callback = [progress_callback](int current, int total) {
+                cpp_callback = [&progress_callback](int current, int total) {
                     // Acquire GIL before calling Python callable
                     nb::gil_scoped_acquire guard;
                     progress_callback(current, total);
                 };
             }
+
+            // Let other Python threads (e.g. the UI) run while we sample
+            nb::gil_scoped_release release;
             return cpp_fns::PointGenerator::generate_interior_points(
-              vertices, faces, num_points, cpp_callback);
+              vertices,
+              faces,
+              num_points,
+              cpp_callback,
+              seed,
+              num_threads,
+              progress_interval);
         },
         nb::arg("vertices").noconvert(),
         nb::arg("faces").noconvert(),
         nb::arg("num_points"),
         nb::arg("progress_callback") = nb::none(),
-        "Generate points inside the mesh using rejection sampling");
+        nb::arg("seed") = nb::none(),
+        nb::arg("num_threads") = 0,
+        nb::arg("progress_interval") = 0.1,
+        "Generate points inside the mesh using multi-threaded rejection "
+        "sampling; a fixed seed gives the same points for any num_threads");
 }
\ No newline at end of file
@@ -52,4 +52,13 @@ interior_points = point_generator_cpp.PointGenerator.generate_interior_points(
 )
 print(f"Generated {len(interior_points)} interior points.")
 if len(interior_points) > 0:
-    print(f"First 5 interior points:\n{interior_points[:5]}")
\ No newline at end of file
+    print(f"First 5 interior points:\n{interior_points[:5]}")
+
+# 4. multi-threaded generation is reproducible for a fixed seed
+seeded_single = point_generator_cpp.PointGenerator.generate_interior_points(
+    vertices, faces, 10000, seed=1234, num_threads=1
+)
+seeded_multi = point_generator_cpp.PointGenerator.generate_interior_points(
+    vertices, faces, 10000, seed=1234, num_threads=0
+)
+print(f"\nSeeded runs identical across thread counts? {np.array_equal(seeded_single, seeded_multi)}")
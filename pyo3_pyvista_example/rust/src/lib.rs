@@ -1,21 +1,44 @@
-use byteorder::LittleEndian;
-use byteorder::ReadBytesExt;
+use memmap2::Mmap;
+use pyo3::exceptions::PyBufferError;
+use pyo3::ffi;
 use pyo3::prelude::*;
+use rayon::prelude::*;
 
 use std:: {
     collections::HashMap, fs::File, io::{BufReader, SeekFrom}, path::Path,
-    io::Read, io::Seek,
+    io::BufRead, io::Read, io::Seek,
     io::Result,
     io::Error, io::ErrorKind,
+    os::raw::{c_char, c_int, c_void},
+    ptr,
 };
 
 use numpy:: {
-    PyArray
+    Element, PyArray, PyArray2, PyArrayMethods
 };
 
+// Binary STL layout: 80 byte header, u32 triangle count, then 50 byte
+// records of normal (3 x f32), 3 vertices (9 x f32) and a u16 attribute
+const HEADER_LEN: usize = 84;
+const RECORD_LEN: usize = 50;
+const NORMAL_LEN: usize = 12;
+
 #[pyclass]
 pub struct StlReader;
 
+/// Read-only view of the triangles of a memory-mapped binary STL file.
+///
+/// Exposes the corner coordinates through the buffer protocol as a strided
+/// (N, 3, 3) float32 array, so `np.asarray(mapped)` does not copy the file.
+#[pyclass]
+pub struct MappedStl {
+    mmap: Mmap,
+    num_tri: usize,
+    shape: [ffi::Py_ssize_t; 3],
+    strides: [ffi::Py_ssize_t; 3],
+    welded: Option<(Py<PyArray2<f32>>, Py<PyArray2<u32>>)>,
+}
+
 #[pymethods]
 impl StlReader {
 
@@ -28,7 +51,7 @@ impl StlReader {
         &self,
         py: Python<'py>,
         filename: &str,
-    ) -> PyResult<(Py<PyArray<f32, numpy::Ix1>>, Py<PyArray<u32, numpy::Ix1>>)> {
+    ) -> PyResult<(Bound<'py, PyArray2<f32>>, Bound<'py, PyArray2<u32>>)> {
 
         let path = Path::new(filename);
         let mut file = BufReader::new(File::open(path)?);
@@ -42,110 +65,289 @@ impl StlReader {
                 file.seek(SeekFrom::Start(0))?;
                 Self::read_ascii_stl(&mut file)?
             } else {
-                println!("Reading binary stl");
-                Self::read_binary_stl(&mut file)?
+                // Weld straight out of the mapped file; no buffered copy of it
+                let mapped = self.map_stl(filename)?;
+                Self::weld_triangles(&mapped.mmap, mapped.num_tri)
+            };
+
+        Ok((
+            Self::into_pyarray2(py, vertices)?,
+            Self::into_pyarray2(py, faces)?,
+        ))
+
+    }
+
+    /// Read an STL file, welding vertices on all cores with the GIL released.
+    /// Returns (N, 3) float32 vertices and (M, 3) uint32 faces.
+    pub fn read_stl_parallel<'py>(
+        &self,
+        py: Python<'py>,
+        filename: &str,
+    ) -> PyResult<(Bound<'py, PyArray2<f32>>, Bound<'py, PyArray2<u32>>)> {
+
+        let mut file = BufReader::new(File::open(Path::new(filename))?);
+
+        let mut header = [0u8; 5];
+        file.read_exact(&mut header)?;
+
+        let (vertices, faces) =
+            if header.eq_ignore_ascii_case(b"solid") {
+                // ASCII files have no fixed layout to split up; parse serially
+                file.seek(SeekFrom::Start(0))?;
+                py.allow_threads(|| Self::read_ascii_stl(&mut file))?
+            } else {
+                let mapped = self.map_stl(filename)?;
+                let num_tri = mapped.num_tri;
+                py.allow_threads(|| Self::weld_triangles_parallel(&mapped.mmap, num_tri))
             };
 
-        let flat_vert: Vec<f32> = vertices.into_iter().flatten().collect();
-        let flat_face: Vec<u32> = faces.into_iter().flatten().collect();
-        let vertices_array = PyArray::from_vec(py, flat_vert);
-        let faces_array = PyArray::from_vec(py, flat_face);
-
-        /*
-        let num_vert = vertices.len();
-        let num_face = faces.len();
-        let vertices_final = 
-            PyArray2::from_vec2(py, &vec![flat_vert])
-                .unwrap()
-                .reshape((num_vert, 3))
-                .unwrap()
-                .to_owned();
-        let faces_final = 
-            PyArray2::from_vec2(py, &vec![flat_face])
-                .unwrap()
-                .reshape((num_face, 3))
-                .unwrap()
-                .to_owned();
-
-        Ok((vertices_final.into(), faces_final.into()))
-        */
-
-        Ok((vertices_array.into(), faces_array.into()))
+        Ok((
+            Self::into_pyarray2(py, vertices)?,
+            Self::into_pyarray2(py, faces)?,
+        ))
+    }
+
+    pub fn map_stl(&self, filename: &str) -> PyResult<MappedStl> {
 
+        let file = File::open(Path::new(filename))?;
+
+        // Safety: the mapping is read-only and the file is expected to stay
+        // unchanged while it is mapped
+        let mmap = unsafe { Mmap::map(&file)? };
+
+        if mmap.len() >= 5 && mmap[..5].eq_ignore_ascii_case(b"solid") {
+            return Err(Error::new(
+                ErrorKind::InvalidData,
+                "only binary STL files can be memory mapped",
+            ).into());
+        }
+
+        let num_tri = Self::triangle_count(&mmap)?;
+
+        Ok(MappedStl {
+            mmap,
+            num_tri,
+            shape: [num_tri as ffi::Py_ssize_t, 3, 3],
+            strides: [RECORD_LEN as ffi::Py_ssize_t, 12, 4],
+            welded: None,
+        })
     }
 }
 
-impl StlReader {
+#[pymethods]
+impl MappedStl {
 
-    fn quantize_coord(val: f32, precision: f32) -> i64 {
-        (val / precision).round() as i64
+    #[getter]
+    fn num_triangles(&self) -> usize {
+        self.num_tri
     }
 
-    fn quantize_vert(vert: [f32; 3], precision: f32) -> [i64; 3] {
-        [
-            Self::quantize_coord(vert[0], precision),
-            Self::quantize_coord(vert[1], precision),
-            Self::quantize_coord(vert[2], precision),
-        ]
+    fn __len__(&self) -> usize {
+        self.num_tri
     }
 
-    fn read_binary_stl<R: Read + Seek>(
-        f: &mut R,
-    ) -> Result<(Vec<[f32; 3]>, Vec<[u32; 3]>)> {
+    /// Weld shared corners into (N, 3) vertex and (M, 3) face arrays. The
+    /// result is computed on first call and cached.
+    pub fn weld<'py>(
+        &mut self,
+        py: Python<'py>,
+    ) -> PyResult<(Py<PyArray2<f32>>, Py<PyArray2<u32>>)> {
+
+        if self.welded.is_none() {
+            let (vertices, faces) = StlReader::weld_triangles(&self.mmap, self.num_tri);
+
+            self.welded = Some((
+                StlReader::into_pyarray2(py, vertices)?.unbind(),
+                StlReader::into_pyarray2(py, faces)?.unbind(),
+            ));
+        }
+
+        let (vertices, faces) = self.welded.as_ref().unwrap();
+        Ok((vertices.clone_ref(py), faces.clone_ref(py)))
+    }
+
+    unsafe fn __getbuffer__(
+        slf: Bound<'_, Self>,
+        view: *mut ffi::Py_buffer,
+        flags: c_int,
+    ) -> PyResult<()> {
+
+        if view.is_null() {
+            return Err(PyBufferError::new_err("View is null"));
+        }
+        if (flags & ffi::PyBUF_WRITABLE) == ffi::PyBUF_WRITABLE {
+            return Err(PyBufferError::new_err("Mapped STL is read-only"));
+        }
+        if (flags & ffi::PyBUF_STRIDES) != ffi::PyBUF_STRIDES {
+            return Err(PyBufferError::new_err("Mapped STL triangles are strided"));
+        }
+
+        let this = slf.borrow();
+
+        // Point at the first vertex of the first record; the 50 byte record
+        // stride skips the normal and attribute of every following triangle
+        let buf = if this.num_tri > 0 {
+            unsafe { this.mmap.as_ptr().add(HEADER_LEN + NORMAL_LEN) }
+        } else {
+            this.mmap.as_ptr()
+        };
+
+        unsafe {
+            (*view).buf = buf as *mut c_void;
+            (*view).len = (this.num_tri * 9 * 4) as ffi::Py_ssize_t;
+            (*view).readonly = 1;
+            (*view).itemsize = 4;
+            (*view).format = if (flags & ffi::PyBUF_FORMAT) == ffi::PyBUF_FORMAT {
+                c"<f".as_ptr() as *mut c_char
+            } else {
+                ptr::null_mut()
+            };
+            (*view).ndim = 3;
+            (*view).shape = this.shape.as_ptr() as *mut ffi::Py_ssize_t;
+            (*view).strides = this.strides.as_ptr() as *mut ffi::Py_ssize_t;
+            (*view).suboffsets = ptr::null_mut();
+            (*view).internal = ptr::null_mut();
+            (*view).obj = slf.clone().into_any().into_ptr();
+        }
 
-        f.seek(SeekFrom::Start(80))?;
+        Ok(())
+    }
+
+    unsafe fn __releasebuffer__(&self, _view: *mut ffi::Py_buffer) {
+        // Nothing to free: shape and strides live as long as the object
+    }
+}
+
+impl StlReader {
+
+    // Hands the Vec's buffer to NumPy without copying and views it as (N, 3)
+    fn into_pyarray2<'py, T: Element>(
+        py: Python<'py>,
+        rows: Vec<[T; 3]>,
+    ) -> PyResult<Bound<'py, PyArray2<T>>> {
+        let num_rows = rows.len();
+        PyArray::from_vec(py, rows.into_flattened()).reshape([num_rows, 3])
+    }
+
+    fn triangle_count(data: &[u8]) -> Result<usize> {
+
+        if data.len() < HEADER_LEN {
+            return Err(Error::new(ErrorKind::UnexpectedEof, "STL header is truncated"));
+        }
+
+        // Trust the file length over the header if the file was truncated
+        let declared = u32::from_le_bytes([data[80], data[81], data[82], data[83]]) as usize;
+        Ok(declared.min((data.len() - HEADER_LEN) / RECORD_LEN))
+    }
+
+    fn vertex_at(data: &[u8], offset: usize) -> [f32; 3] {
+        let coord = |o: usize| {
+            f32::from_le_bytes([data[o], data[o + 1], data[o + 2], data[o + 3]])
+        };
+        [coord(offset), coord(offset + 4), coord(offset + 8)]
+    }
 
-        let num_tri = f.read_u32::<LittleEndian>()?;
-        println!("num_tri {}", num_tri);
+    fn weld_triangles(
+        data: &[u8],
+        num_tri: usize,
+    ) -> (Vec<[f32; 3]>, Vec<[u32; 3]>) {
 
         let mut verts: Vec<[f32; 3]> = Vec::new();
-        let mut faces: Vec<[u32; 3]> = Vec::new();
+        let mut faces: Vec<[u32; 3]> = Vec::with_capacity(num_tri);
 
         let mut vert_map: HashMap<[i64; 3], u32> = HashMap::new();
         let precision = 1.0e-6;
 
-        for _ in 0..num_tri {
-            f.seek(SeekFrom::Current(12))?;
-
-            let mut tri_verts: Vec<u32> = Vec::with_capacity(3);
-            for _ in 0..3 {
-                let x = f.read_f32::<LittleEndian>()?;
-                let y = f.read_f32::<LittleEndian>()?;
-                let z = f.read_f32::<LittleEndian>()?;
-
-                let vert = [x, y, z];
-                println!("vert = {}{}{} ", x, y, z);
+        for tri in 0..num_tri {
+            let record = HEADER_LEN + tri * RECORD_LEN + NORMAL_LEN;
 
+            let mut tri_verts = [0u32; 3];
+            for (corner, vert_idx) in tri_verts.iter_mut().enumerate() {
+                let vert = Self::vertex_at(data, record + corner * 12);
                 let i64_vert = Self::quantize_vert(vert, precision);
 
-                let vert_idx = if let Some(&existing_idx) = vert_map.get(&i64_vert) {
-                    existing_idx
-                } else {
-                    let new_idx = verts.len() as u32;
+                *vert_idx = *vert_map.entry(i64_vert).or_insert_with(|| {
                     verts.push(vert);
-                    vert_map.insert(i64_vert, new_idx);
-                    new_idx
-                };
-
-                tri_verts.push(vert_idx);
+                    (verts.len() - 1) as u32
+                });
             }
 
-            let _ = f.seek(SeekFrom::Current(2));
+            faces.push(tri_verts);
+        }
+
+        (verts, faces)
+    }
+
+    fn quantize_coord(val: f32, precision: f32) -> i64 {
+        (val / precision).round() as i64
+    }
+
+    fn quantize_vert(vert: [f32; 3], precision: f32) -> [i64; 3] {
+        [
+            Self::quantize_coord(vert[0], precision),
+            Self::quantize_coord(vert[1], precision),
+            Self::quantize_coord(vert[2], precision),
+        ]
+    }
+
+    fn weld_triangles_parallel(
+        data: &[u8],
+        num_tri: usize,
+    ) -> (Vec<[f32; 3]>, Vec<[u32; 3]>) {
 
-            if tri_verts.len() == 3 {
-                faces.push([
-                    tri_verts[0],
-                    tri_verts[1],
-                    tri_verts[2],
-                ]);
+        let precision = 1.0e-6;
+
+        // Decode and quantize every corner in parallel
+        let corners: Vec<([i64; 3], [f32; 3])> = (0..num_tri * 3)
+            .into_par_iter()
+            .map(|corner| {
+                let offset = HEADER_LEN
+                    + (corner / 3) * RECORD_LEN
+                    + NORMAL_LEN
+                    + (corner % 3) * 12;
+                let vert = Self::vertex_at(data, offset);
+                (Self::quantize_vert(vert, precision), vert)
+            })
+            .collect();
+
+        // Sort corner ids by quantized position so equal corners are adjacent;
+        // ties break on the id, so the lowest id represents each vertex
+        let mut order: Vec<u32> = (0..corners.len() as u32).collect();
+        order.par_sort_unstable_by_key(|&c| (corners[c as usize].0, c));
+
+        // One sweep over the sorted ids assigns a vertex per run of equal keys
+        let mut verts: Vec<[f32; 3]> = Vec::new();
+        let mut corner_vert = vec![0u32; corners.len()];
+        let mut prev_key: Option<[i64; 3]> = None;
+
+        for &c in &order {
+            let (key, vert) = corners[c as usize];
+            if prev_key != Some(key) {
+                verts.push(vert);
+                prev_key = Some(key);
             }
+            corner_vert[c as usize] = (verts.len() - 1) as u32;
         }
 
-        Ok((verts, faces))
+        let faces: Vec<[u32; 3]> = corner_vert
+            .par_chunks_exact(3)
+            .map(|tri| [tri[0], tri[1], tri[2]])
+            .collect();
+
+        (verts, faces)
+    }
 
+    fn parse_coord(token: Option<&[u8]>) -> Result<f32> {
+        let token = token.ok_or_else(|| {
+            Error::new(ErrorKind::InvalidData, "vertex line has fewer than 3 coordinates")
+        })?;
+        std::str::from_utf8(token)
+            .map_err(|e| Error::new(ErrorKind::InvalidData, e.to_string()))?
+            .parse::<f32>()
+            .map_err(|e| Error::new(ErrorKind::InvalidData, e.to_string()))
     }
 
-    fn read_ascii_stl<R: Read>(
+    fn read_ascii_stl<R: BufRead>(
         f: &mut R,
     ) -> Result<(Vec<[f32; 3]>, Vec<[u32; 3]>)> {
 
@@ -155,73 +357,44 @@ impl StlReader {
         let mut vert_map: HashMap<[i64; 3], u32> = HashMap::new();
         let precision = 1.0e-6;
 
-        let mut data = String::new();
-
-        f.read_to_string(&mut data)?;
-
-        let lines: Vec<&str> = data.lines().collect();
-
-        let mut i = 0;
-
-        while i < lines.len() {
+        // Stream one line at a time through a reused buffer instead of
+        // holding the whole file and a Vec of its lines in memory
+        let mut line: Vec<u8> = Vec::with_capacity(128);
+        let mut tri_verts = [0u32; 3];
+        let mut corner = 0;
 
-            let line = lines[i].trim().to_lowercase();
-            if line.starts_with("facet normal") {
-                i += 2;
+        while f.read_until(b'\n', &mut line)? > 0 {
 
-                let mut tri_verts: Vec<u32> = Vec::with_capacity(3);
-                for _ in 0..3 {
+            let mut tokens = line
+                .split(|b| b.is_ascii_whitespace())
+                .filter(|t| !t.is_empty());
 
-                    if i < lines.len() {
-                        let vert_line = lines[i].trim();
-                        if vert_line.starts_with("vertex") {
+            match tokens.next() {
+                Some(keyword) if keyword.eq_ignore_ascii_case(b"vertex") => {
+                    let x = Self::parse_coord(tokens.next())?;
+                    let y = Self::parse_coord(tokens.next())?;
+                    let z = Self::parse_coord(tokens.next())?;
 
-                            let coords_str: Vec<&str> = 
-                                vert_line.split_whitespace().skip(1).take(3).collect();
-                            if coords_str.len() == 3 {
-                                let x = coords_str[0].parse::<f32>().map_err(
-                                    |e| {
-                                        Error::new(ErrorKind::InvalidData, e.to_string())
-                                    })?;
-                                let y = coords_str[1].parse::<f32>().map_err(
-                                    |e| {
-                                        Error::new(ErrorKind::InvalidData, e.to_string())
-                                    })?;
-                                let z = coords_str[2].parse::<f32>().map_err(
-                                    |e| {
-                                        Error::new(ErrorKind::InvalidData, e.to_string())
-                                    })?;
+                    let vert = [x, y, z];
+                    let i64_vert = Self::quantize_vert(vert, precision);
 
-                                let vert = [x, y, z];
+                    tri_verts[corner] = *vert_map.entry(i64_vert).or_insert_with(|| {
+                        verts.push(vert);
+                        (verts.len() - 1) as u32
+                    });
+                    corner += 1;
 
-                                let i64_vert = Self::quantize_vert(vert, precision);
-
-                                let vert_idx = if let Some(&existing_idx) = vert_map.get(&i64_vert) {
-                                    existing_idx
-                                } else {
-                                    let new_idx = verts.len() as u32;
-                                    verts.push(vert);
-                                    vert_map.insert(i64_vert, new_idx);
-                                    new_idx
-                                };
-
-                                tri_verts.push(vert_idx);
-                            }
-                        }
+                    if corner == 3 {
+                        faces.push(tri_verts);
+                        corner = 0;
                     }
-                    i += 1;
-                }
-
-                if tri_verts.len() == 3 {
-                    faces.push([
-                        tri_verts[0],
-                        tri_verts[1],
-                        tri_verts[2],
-                    ]);
                 }
-            } else {
-                i += 1;
+                // A new facet drops any corners left over from a malformed one
+                Some(keyword) if keyword.eq_ignore_ascii_case(b"facet") => corner = 0,
+                _ => {}
             }
+
+            line.clear();
         }
 
         Ok((verts, faces))
@@ -234,5 +407,6 @@ impl StlReader {
 #[pymodule]
 fn pyo3_pyvista_example(m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_class::<StlReader>()?;
+    m.add_class::<MappedStl>()?;
     Ok(())
 }
@@ -28,3 +28,10 @@ print("Vertices = ", verts_b)
 
 verts_a, faces_a = reader.read_stl("ascii_test.stl")
 print("Vertices = ", verts_a)
+
+mapped = reader.map_stl("binary_test.stl")
+print("Mapped triangles = ", np.asarray(mapped))
+print("Welded = ", mapped.weld())
+
+verts_p, faces_p = reader.read_stl_parallel("binary_test.stl")
+print("Parallel vertices = ", verts_p.shape, "faces = ", faces_p.shape)